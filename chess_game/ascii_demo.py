@@ -69,7 +69,7 @@ def show_piece_symbols():
                             piece = board.get_piece_at(row, col)
                             if piece:
                                 symbol = renderer.get_piece_symbol(piece)
-                                piece_name = piece.get_piece_type().capitalize()
+                                piece_name = str(piece.get_piece_type()).capitalize()
                                 color = "White" if piece.is_white() else "Black"
                                 print(f"Clicked: {color} {piece_name} ('{symbol}') at {chr(ord('a')+col)}{8-row}")
         
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Engine benchmarks
+Times the core engine operations on reproducible position sets.
+
+Usage:
+    python benchmark.py fen [--count N]
+    python benchmark.py batch [--count N]   (needs numpy)
+    python benchmark.py clone [--count N]
+    python benchmark.py search [--depth N] [--time SECONDS] [--hash MB]
+"""
+
+import argparse
+import copy
+import random
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from board import Board
+from ai_player import AIPlayer
+from search import Search
+from transposition import TranspositionTable
+from bitboard import square_position
+from move import move_from, move_to
+import movegen
+
+
+def random_positions(count, seed=1, max_plies=80):
+    """FENs reached by seeded random playouts from the start position"""
+    rng = random.Random(seed)
+    fens = []
+    while len(fens) < count:
+        board = Board()
+        for _ in range(rng.randrange(max_plies)):
+            moves = board.generate_legal_moves()
+            if not moves:
+                break
+            board.push_move(rng.choice(moves))
+        fens.append(board.to_fen())
+    return fens
+
+
+def report(label, count, elapsed):
+    """Print a throughput line"""
+    print(f"{label:<28} {count:>9} in {elapsed:7.3f}s  {count / elapsed:>12,.0f}/s")
+
+
+def bench_fen(args):
+    """FEN parsing and serialization throughput"""
+    fens = random_positions(args.positions)
+    lines = fens * (args.count // len(fens) + 1)
+    lines = lines[:args.count]
+    
+    start = time.perf_counter()
+    boards = [Board.from_fen(fen) for fen in lines]
+    report("Board.from_fen", len(lines), time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    for board in boards:
+        board.to_fen()
+    report("Board.to_fen", len(boards), time.perf_counter() - start)
+
+
+def bench_batch(args):
+    """Batched NumPy move generation against the per-position generator"""
+    import batch_movegen
+    
+    fens = random_positions(args.positions)
+    boards = [Board.from_fen(fen) for fen in fens]
+    boards = (boards * (args.count // len(boards) + 1))[:args.count]
+    
+    start = time.perf_counter()
+    for board in boards:
+        movegen.generate_legal_moves(board)
+    report("movegen per position", len(boards), time.perf_counter() - start)
+    
+    arrays = batch_movegen.encode_positions(boards)
+    start = time.perf_counter()
+    moves = batch_movegen.generate_legal_moves_batch(*arrays)
+    report("batch_movegen", len(boards), time.perf_counter() - start)
+    print(f"{len(moves.position):,} moves")
+
+
+def bench_clone(args):
+    """Board.clone against the generic deepcopy of every board attribute"""
+    rng = random.Random(1)
+    boards = []
+    for fen in random_positions(args.positions):
+        # Play a few more moves through the game API so boards carry a move history
+        board = Board.from_fen(fen)
+        for _ in range(rng.randrange(1, 20)):
+            moves = board.generate_legal_moves()
+            if not moves:
+                break
+            move = rng.choice(moves)
+            board.move_piece(square_position(move_from(move)), square_position(move_to(move)))
+        boards.append(board)
+    boards = (boards * (args.count // len(boards) + 1))[:args.count]
+    
+    start = time.perf_counter()
+    for board in boards:
+        # What copy.deepcopy did before Board defined __deepcopy__
+        copied = Board.__new__(Board)
+        copied.__dict__.update(copy.deepcopy(board.__dict__))
+    report("generic deepcopy", len(boards), time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    for board in boards:
+        board.clone()
+    report("Board.clone", len(boards), time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    for board in boards:
+        board.clone(history=False)
+    report("Board.clone(history=False)", len(boards), time.perf_counter() - start)
+
+
+# Fixed search positions: opening, open game, Kiwipete, middlegame, endgame
+SEARCH_POSITIONS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+]
+
+
+def bench_search(args):
+    """Alpha-beta search against the original full-width AI scorer"""
+    ai = AIPlayer()
+    for label, depth in (("legacy medium (2 plies)", 1), ("legacy hard (3 plies)", 2)):
+        nodes = 0
+        start = time.perf_counter()
+        for fen in SEARCH_POSITIONS:
+            ai._get_smart_move(Board.from_fen(fen), depth)
+            nodes += ai.nodes
+        elapsed = time.perf_counter() - start
+        print(f"{label:<28} {nodes:>9} nodes in {elapsed:7.3f}s")
+    
+    search = Search()
+    for depth in range(1, args.depth + 1):
+        nodes = cutoffs = first_move_cutoffs = 0
+        start = time.perf_counter()
+        for fen in SEARCH_POSITIONS:
+            search.search(Board.from_fen(fen), depth)
+            nodes += search.nodes
+            cutoffs += search.cutoffs
+            first_move_cutoffs += search.first_move_cutoffs
+        elapsed = time.perf_counter() - start
+        rate = first_move_cutoffs / cutoffs if cutoffs else 0.0
+        print(f"{f'alpha-beta depth {depth}':<28} {nodes:>9} nodes in {elapsed:7.3f}s, {rate:.1%} cutoffs on first move")
+    
+    # The same depths with a transposition table
+    table = TranspositionTable(args.hash)
+    search = Search(table)
+    for depth in range(1, args.depth + 1):
+        nodes = cutoffs = first_move_cutoffs = 0
+        start = time.perf_counter()
+        for fen in SEARCH_POSITIONS:
+            table.clear()
+            search.search(Board.from_fen(fen), depth)
+            nodes += search.nodes
+            cutoffs += search.cutoffs
+            first_move_cutoffs += search.first_move_cutoffs
+        elapsed = time.perf_counter() - start
+        rate = first_move_cutoffs / cutoffs if cutoffs else 0.0
+        print(f"{f'alpha-beta + TT depth {depth}':<28} {nodes:>9} nodes in {elapsed:7.3f}s, {rate:.1%} cutoffs on first move")
+    
+    # Iterative deepening: the depth each position reaches within the budget
+    table.clear()
+    for fen in SEARCH_POSITIONS:
+        start = time.perf_counter()
+        search.iterate(Board.from_fen(fen), time_limit=args.time)
+        elapsed = time.perf_counter() - start
+        print(f"{f'{args.time:g}s budget: depth {search.depth}':<28} {search.nodes:>9} nodes in {elapsed:7.3f}s")
+    print(f"TT {args.hash:g} MB: hit rate {table.hit_rate:.1%}, fill {table.fill_ratio:.1%}")
+
+
+BENCHMARKS = {
+    'fen': bench_fen,
+    'batch': bench_batch,
+    'clone': bench_clone,
+    'search': bench_search,
+}
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Chess engine benchmarks")
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS), help="what to measure")
+    parser.add_argument('--count', type=int, default=20000, help="operations to time")
+    parser.add_argument('--positions', type=int, default=500, help="distinct random positions to use")
+    parser.add_argument('--depth', type=int, default=4, help="deepest alpha-beta search to time")
+    parser.add_argument('--time', type=float, default=1.0, help="iterative deepening budget per position, in seconds")
+    parser.add_argument('--hash', type=float, default=16, metavar='MB', help="transposition table size")
+    args = parser.parse_args(argv)
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
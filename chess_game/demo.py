@@ -34,7 +34,7 @@ def demo_chess_game():
             for col in range(8):
                 piece = board.get_piece_at(row, col)
                 if piece:
-                    symbol = piece.get_piece_type()[0].upper() if piece.color == WHITE_PIECE else piece.get_piece_type()[0].lower()
+                    symbol = str(piece.get_piece_type())[0].upper() if piece.color == WHITE_PIECE else str(piece.get_piece_type())[0].lower()
                     row_pieces.append(symbol)
                 else:
                     row_pieces.append('.')
@@ -5,164 +5,185 @@ Implements a simple AI that can play chess
 
 import random
 from constants import *
+from bitboard import *
+from position import Position
+from move import move_from, move_to, move_promotion
+from search import Search
+from transposition import TranspositionTable
+
+# Search limits for each difficulty as (deepest iteration in plies, seconds
+# per move); 'easy' plays random moves
+SEARCH_LIMITS = {'medium': (3, 1.0), 'hard': (6, 3.0)}
+
+
+def move_positions(move):
+    """(from_pos, to_pos, promotion) of a packed move; promotion is a PieceType or None"""
+    return square_position(move_from(move)), square_position(move_to(move)), move_promotion(move)
+
 
 class AIPlayer:
-    def __init__(self, difficulty='medium'):
-        """Initialize AI player with a difficulty level"""
+    def __init__(self, difficulty='medium', time_limit=None, node_limit=None, hash_mb=TRANSPOSITION_TABLE_MB):
+        """Initialize AI player with a difficulty level and optional per-move budget overrides"""
         self.difficulty = difficulty  # 'easy', 'medium', 'hard'
+        self.time_limit = time_limit  # Seconds per move (default: from the difficulty)
+        self.node_limit = node_limit  # Nodes per move (default: no limit)
+        self.table = TranspositionTable(hash_mb)  # Kept between moves
+        self.search = Search(self.table)  # The latest search, for stop() and its statistics
+        self.nodes = 0  # Positions visited by the legacy scorer
+    
+    def new_search(self):
+        """Fresh search sharing the transposition table; stop() signals it from now on"""
+        self.search = Search(self.table)
+        return self.search
     
-    def get_move(self, board):
-        """Get the AI's next move based on the current board state"""
+    def get_move(self, board, search=None):
+        """Get the AI's next move as (from_pos, to_pos, promotion) for a Board or a Position snapshot
+        
+        Callers on another thread should create the search with new_search()
+        before starting the thread, so a stop() in between isn't lost.
+        """
+        # Search on a private board: moves are made and unmade in place,
+        # and the UI keeps rendering the live board meanwhile
+        if isinstance(board, Position):
+            board = board.to_board()
+        else:
+            board = board.clone()
+        
         if self.difficulty == 'easy':
             return self._get_random_move(board)
-        elif self.difficulty == 'medium':
-            return self._get_smart_move(board)
-        else:  # hard
-            return self._get_smart_move(board, depth=2)
+        if search is None:
+            search = self.new_search()
+        return self._get_search_move(board, search)
+    
+    def stop(self):
+        """Make the latest search, running or about to run on another thread, return its best move so far"""
+        self.search.stop()
     
     def _get_random_move(self, board):
         """Make a completely random legal move"""
-        # Get all pieces of the current player
-        pieces = []
-        for row in range(8):
-            for col in range(8):
-                piece = board.get_piece_at(row, col)
-                if piece and piece.color == board.current_player:
-                    pieces.append((row, col, piece))
-        
-        # Shuffle pieces for randomness
-        random.shuffle(pieces)
-        
-        # Try each piece until we find one with valid moves
-        for row, col, piece in pieces:
-            valid_moves = piece.get_valid_moves(board)
-            if valid_moves:
-                # Choose a random move
-                to_pos = random.choice(valid_moves)
-                return (row, col), to_pos
-        
-        # No valid moves found (shouldn't happen unless checkmate/stalemate)
-        return None
+        moves = board.generate_legal_moves()
+        
+        # No legal moves (checkmate/stalemate)
+        if not moves:
+            return None
+        
+        # Choose a random move
+        move = random.choice(moves)
+        return move_positions(move)
+    
+    def _get_search_move(self, board, search):
+        """Best move found by iterative deepening within the difficulty's budget"""
+        max_depth, time_limit = SEARCH_LIMITS.get(self.difficulty, SEARCH_LIMITS['hard'])
+        if self.time_limit is not None:
+            time_limit = self.time_limit
+        
+        # A fresh search per move: a superseded search may still be finishing on its thread
+        move, score = search.iterate(board, max_depth, time_limit, self.node_limit)
+        if move is None:
+            return None
+        return move_positions(move)
     
     def _get_smart_move(self, board, depth=1):
-        """Make a smarter move by evaluating piece values"""
+        """Make a smarter move by evaluating piece values (the original full-width scorer, kept as a baseline)"""
+        self.nodes = 0
         best_score = float('-inf')
         best_move = None
         
-        # Get all pieces of the current player
-        pieces = []
-        for row in range(8):
-            for col in range(8):
-                piece = board.get_piece_at(row, col)
-                if piece and piece.color == board.current_player:
-                    pieces.append((row, col, piece))
-        
-        # Try each piece and each of its moves
-        for row, col, piece in pieces:
-            valid_moves = piece.get_valid_moves(board)
-            for to_pos in valid_moves:
-                # Simulate the move
-                score = self._evaluate_move(board, (row, col), to_pos, depth)
-                
-                # Keep track of the best move
-                if score > best_score:
-                    best_score = score
-                    best_move = ((row, col), to_pos)
+        # Try each legal move of the current player
+        for move in board.generate_legal_moves():
+            score = self._evaluate_move(board, move, depth)
+            
+            # Keep track of the best move
+            if score > best_score:
+                best_score = score
+                best_move = move_positions(move)
         
         return best_move
     
-    def _evaluate_move(self, board, from_pos, to_pos, depth):
-        """Evaluate a move by simulating it and scoring the resulting position"""
-        # Create a copy of the board
-        temp_board = board._simulate_move(from_pos, to_pos)
+    def _evaluate_move(self, board, move, depth):
+        """Evaluate a move by making it in place and scoring the resulting position"""
+        player = board.current_player
+        opponent_color = BLACK_PIECE if player == WHITE_PIECE else WHITE_PIECE
+        board.push_move(move)
+        self.nodes += 1
+        
+        # A repeated position or the fifty-move rule is a draw: score it as
+        # even and don't search further down the branch
+        if board.is_repetition() or board.is_fifty_move_draw():
+            board.pop_move()
+            return 0
         
-        # Base score: material advantage
-        score = self._evaluate_material(temp_board)
+        # Base score: material advantage for the player who moved
+        score = self._evaluate_material(board, player)
         
         # Add positional scoring
-        score += self._evaluate_position(temp_board)
+        score += self._evaluate_position(board, player)
         
-        # Check for check/checkmate
-        opponent_color = BLACK_PIECE if temp_board.current_player == WHITE_PIECE else WHITE_PIECE
-        if temp_board.is_checkmate(opponent_color):
-            score += 1000  # Big bonus for checkmate
-        elif temp_board.is_in_check(opponent_color):
-            score += 50    # Bonus for check
+        # Check for check/checkmate (at the leaves one legal reply is enough to know)
+        replies = board.generate_legal_moves() if depth > 0 else ()
+        if board.is_in_check(opponent_color):
+            has_replies = bool(replies) if depth > 0 else board.has_legal_moves()
+            score += 50 if has_replies else 1000  # Bonus for check, big bonus for checkmate
         
         # Look ahead if depth > 0
-        if depth > 0:
-            # Find the opponent's best response
-            opponent_best_score = float('-inf')
-            
-            # Get all opponent pieces
-            for row in range(8):
-                for col in range(8):
-                    piece = temp_board.get_piece_at(row, col)
-                    if piece and piece.color == opponent_color:
-                        valid_moves = piece.get_valid_moves(temp_board)
-                        for next_pos in valid_moves:
-                            # Evaluate opponent's move
-                            response_score = -self._evaluate_move(temp_board, (row, col), next_pos, depth-1)
-                            opponent_best_score = max(opponent_best_score, response_score)
+        if replies:
+            # Find the opponent's best response (scored from the opponent's side)
+            opponent_best_score = max(self._evaluate_move(board, reply, depth-1) for reply in replies)
             
             # Subtract opponent's best response from our score
-            if opponent_best_score != float('-inf'):
-                score -= opponent_best_score
+            score -= opponent_best_score
+        
+        # Take the move back
+        board.pop_move()
         
         return score
     
-    def _evaluate_material(self, board):
-        """Evaluate material advantage on the board"""
+    def _evaluate_material(self, board, color=None):
+        """Evaluate material advantage on the board for color (default: side to move)"""
         score = 0
-        for row in range(8):
-            for col in range(8):
-                piece = board.get_piece_at(row, col)
-                if piece:
-                    # Add piece value for our pieces, subtract for opponent's
-                    value = PIECE_VALUES.get(piece.get_piece_type(), 0)
-                    if piece.color == board.current_player:
-                        score += value
-                    else:
-                        score -= value
+        player = COLOR_INDEX[color if color is not None else board.current_player]
+        for index, bb in enumerate(board.bitboards):
+            if bb:
+                # Add piece value for our pieces, subtract for opponent's
+                value = PIECE_VALUES[PIECE_TYPES[index % 6]] * popcount(bb)
+                if index // 6 == player:
+                    score += value
+                else:
+                    score -= value
         return score
     
-    def _evaluate_position(self, board):
-        """Evaluate positional advantages"""
+    def _evaluate_position(self, board, color=None):
+        """Evaluate positional advantages for color (default: side to move)"""
         score = 0
-        current_player = board.current_player
+        current_player = color if color is not None else board.current_player
+        own = board.get_occupancy(current_player)
         
         # Bonus for controlling the center
-        center_squares = [(3, 3), (3, 4), (4, 3), (4, 4)]
-        for row, col in center_squares:
-            piece = board.get_piece_at(row, col)
-            if piece:
-                if piece.color == current_player:
-                    score += 3
-                else:
-                    score -= 3
+        center_pieces = board.occupied & CENTER_MASK
+        score += 3 * popcount(center_pieces & own)
+        score -= 3 * popcount(center_pieces & ~own)
+        
+        # Bonus for center squares attacked (read from the board's attack maps)
+        opponent = BLACK_PIECE if current_player == WHITE_PIECE else WHITE_PIECE
+        score += popcount(board.attacked_squares(current_player) & CENTER_MASK)
+        score -= popcount(board.attacked_squares(opponent) & CENTER_MASK)
         
         # Bonus for developed pieces (not in starting position)
         back_row = 7 if current_player == WHITE_PIECE else 0
-        for col in range(8):
-            piece = board.get_piece_at(back_row, col)
-            if piece and piece.color == current_player and piece.has_moved:
-                score += 2
+        score += 2 * popcount(own & ROW_MASKS[back_row] & ~board.unmoved)
         
         # Penalty for moving king early (except castling)
-        king_moved = False
-        for row in range(8):
-            for col in range(8):
-                piece = board.get_piece_at(row, col)
-                if piece and piece.color == current_player and piece.get_piece_type() == KING:
-                    if piece.has_moved and len(board.move_history) < 10:
-                        # Check if it was a castling move
-                        was_castling = False
-                        for move in board.move_history:
-                            if move.piece == piece and abs(move.from_pos[1] - move.to_pos[1]) == 2:
-                                was_castling = True
-                                break
-                        
-                        if not was_castling:
-                            score -= 10
-        
-        return score
\ No newline at end of file
+        king_sq = board.king_squares[current_player]
+        if king_sq is not None and not board.unmoved >> king_sq & 1 and len(board.move_history) < 10:
+            # Check if it was a castling move
+            was_castling = False
+            for move in board.move_history:
+                if (move.piece_type == KING and move.color == current_player
+                        and abs(move.from_pos[1] - move.to_pos[1]) == 2):
+                    was_castling = True
+                    break
+            
+            if not was_castling:
+                score -= 10
+        
+        return score
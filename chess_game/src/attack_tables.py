@@ -0,0 +1,110 @@
+"""
+Precomputed attack and geometry tables
+Built once at import for all 64 squares, so move generation and attack
+detection look geometry up instead of stepping through offsets. The tables
+are built by stepping on a 0x88 board, where off-board squares are
+detected with a single mask test.
+"""
+
+from bitboard import WHITE_INDEX, BLACK_INDEX
+
+KNIGHT_OFFSETS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+KING_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+# Ray directions as (row step, col step), in opposite pairs (d ^ 1 reverses d).
+# Rays in the "positive" directions run towards higher square indices, so
+# their first blocker is the lowest set bit
+NORTH, SOUTH, EAST, WEST, NORTH_EAST, SOUTH_WEST, NORTH_WEST, SOUTH_EAST = range(8)
+DIRECTIONS = [(-1, 0), (1, 0), (0, 1), (0, -1), (-1, 1), (1, -1), (-1, -1), (1, 1)]
+POSITIVE_DIRECTIONS = (SOUTH, EAST, SOUTH_WEST, SOUTH_EAST)
+ROOK_DIRECTIONS = (NORTH, SOUTH, EAST, WEST)
+BISHOP_DIRECTIONS = (NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST)
+
+
+def to_0x88(square):
+    """Square index on the 16-column 0x88 board (row * 16 + col)"""
+    return square + (square & ~7)
+
+
+def from_0x88(square_0x88):
+    """Square index of an on-board 0x88 square"""
+    return (square_0x88 + (square_0x88 & 7)) >> 1
+
+
+def _offset_table(offsets):
+    """Bitboard of squares reached by each offset, for every square"""
+    # Step on the 0x88 board: a target is off the board exactly when it has a 0x88 bit set
+    steps = [dr * 16 + dc for dr, dc in offsets]
+    table = []
+    for square in range(64):
+        origin = to_0x88(square)
+        attacks = 0
+        for step in steps:
+            target = origin + step
+            if not target & 0x88:
+                attacks |= 1 << from_0x88(target)
+        table.append(attacks)
+    return table
+
+
+def _ray_squares(square, direction):
+    """Squares along a ray from square (exclusive), nearest first"""
+    dr, dc = DIRECTIONS[direction]
+    step = dr * 16 + dc
+    squares = []
+    target = to_0x88(square) + step
+    while not target & 0x88:
+        squares.append(from_0x88(target))
+        target += step
+    return squares
+
+
+KNIGHT_ATTACKS = _offset_table(KNIGHT_OFFSETS)
+KING_ATTACKS = _offset_table(KING_OFFSETS)
+
+# PAWN_ATTACKS[color index][square]: white pawns capture towards row 0
+PAWN_ATTACKS = [None, None]
+PAWN_ATTACKS[WHITE_INDEX] = _offset_table([(-1, -1), (-1, 1)])
+PAWN_ATTACKS[BLACK_INDEX] = _offset_table([(1, -1), (1, 1)])
+
+# RAYS[direction][square]: every square along the ray, ignoring blockers
+RAYS = [[sum(1 << s for s in _ray_squares(square, direction)) for square in range(64)]
+        for direction in range(8)]
+IS_POSITIVE_DIRECTION = [direction in POSITIVE_DIRECTIONS for direction in range(8)]
+
+
+def _line_tables():
+    """Build the BETWEEN and LINE tables for every pair of aligned squares"""
+    between_table = [[0] * 64 for _ in range(64)]
+    line_table = [[0] * 64 for _ in range(64)]
+    for square in range(64):
+        for direction in range(8):
+            line = RAYS[direction][square] | RAYS[direction ^ 1][square] | (1 << square)
+            between = 0
+            for target in _ray_squares(square, direction):
+                between_table[square][target] = between
+                line_table[square][target] = line
+                between |= 1 << target
+    return between_table, line_table
+
+
+# BETWEEN[a][b]: squares strictly between a and b when they share a line
+# LINE[a][b]: the whole line through a and b (including both), edge to edge
+BETWEEN, LINE = _line_tables()
+
+
+def ray_attacks(square, directions, occupied):
+    """Sliding attacks from square along the given directions, up to the first blockers"""
+    attacks = 0
+    for direction in directions:
+        ray = RAYS[direction][square]
+        blockers = ray & occupied
+        if blockers:
+            # Cut the ray behind the nearest blocker
+            if IS_POSITIVE_DIRECTION[direction]:
+                first = (blockers & -blockers).bit_length() - 1
+            else:
+                first = blockers.bit_length() - 1
+            ray ^= RAYS[direction][first]
+        attacks |= ray
+    return attacks
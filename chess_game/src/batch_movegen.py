@@ -0,0 +1,257 @@
+"""
+Batched legal move generation with NumPy
+Generates legal moves for many positions at once for offline analysis.
+Positions come in as arrays: an (N, 64) int8 tensor of mailbox piece codes
+(as in Board.squares) plus side-to-move, castling-rights and en passant
+vectors. Attacks use the same precomputed tables and magic lookups as the
+rest of the engine, vectorized over every piece of every position.
+Requires numpy.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from constants import *
+from bitboard import *
+from attack_tables import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS
+from magic import (ROOK_MAGICS, ROOK_MASKS, ROOK_SHIFTS, ROOK_TABLES,
+                   BISHOP_MAGICS, BISHOP_MASKS, BISHOP_SHIFTS, BISHOP_TABLES)
+
+# Moves of a batch, one entry per move: the position it belongs to, its
+# squares and the promotion piece type (-1 for none), sorted by position
+BatchMoves = namedtuple('BatchMoves', ['position', 'from_square', 'to_square', 'promotion'])
+
+SQUARE_BITS = np.array([1 << square for square in range(64)], dtype=np.uint64)
+KNIGHT_TABLE = np.array(KNIGHT_ATTACKS, dtype=np.uint64)
+KING_TABLE = np.array(KING_ATTACKS, dtype=np.uint64)
+PAWN_TABLE = np.array(PAWN_ATTACKS, dtype=np.uint64)  # [color index][square]
+PROMOTION_CODES = np.array([int(piece_type) for piece_type in (QUEEN, ROOK, BISHOP, KNIGHT)], dtype=np.int8)
+
+
+def _magic_arrays(masks, magics, shifts, tables):
+    """Flatten one slider's magic tables into arrays for vectorized lookups"""
+    offsets = np.cumsum([0] + [len(table) for table in tables[:-1]])
+    flat = np.array([attack for table in tables for attack in table], dtype=np.uint64)
+    return (np.array(masks, dtype=np.uint64), np.array(magics, dtype=np.uint64),
+            np.array(shifts, dtype=np.uint64), offsets.astype(np.int64), flat)
+
+
+ROOK_ARRAYS = _magic_arrays(ROOK_MASKS, ROOK_MAGICS, ROOK_SHIFTS, ROOK_TABLES)
+BISHOP_ARRAYS = _magic_arrays(BISHOP_MASKS, BISHOP_MAGICS, BISHOP_SHIFTS, BISHOP_TABLES)
+
+
+def _slider_attacks(arrays, squares, occupied):
+    """Magic lookup for arrays of squares and occupancies (uint64 products wrap like MASK64)"""
+    masks, magics, shifts, offsets, flat = arrays
+    index = ((occupied & masks[squares]) * magics[squares]) >> shifts[squares]
+    return flat[offsets[squares] + index.astype(np.int64)]
+
+
+def _piece_attacks(type_index, color, squares, occupied):
+    """Attack bitboards of pieces of one type standing on squares"""
+    if type_index == PAWN_INDEX:
+        return PAWN_TABLE[color, squares]
+    if type_index == KNIGHT_INDEX:
+        return KNIGHT_TABLE[squares]
+    if type_index == BISHOP_INDEX:
+        return _slider_attacks(BISHOP_ARRAYS, squares, occupied)
+    if type_index == ROOK_INDEX:
+        return _slider_attacks(ROOK_ARRAYS, squares, occupied)
+    if type_index == QUEEN_INDEX:
+        return _slider_attacks(BISHOP_ARRAYS, squares, occupied) | _slider_attacks(ROOK_ARRAYS, squares, occupied)
+    return KING_TABLE[squares]
+
+
+def _bits(bitboards):
+    """(row, square) index pairs of every set bit in an array of bitboards"""
+    # Peel off the lowest bit of every non-empty bitboard per pass, so the
+    # passes are bounded by the largest popcount rather than by 64
+    rows = np.nonzero(bitboards)[0]
+    bitboards = bitboards[rows]
+    row_parts, square_parts = [], []
+    while len(rows):
+        low = bitboards & (~bitboards + np.uint64(1))
+        row_parts.append(rows)
+        square_parts.append(np.log2(low).astype(np.int64))  # Exact for powers of two
+        bitboards = bitboards ^ low
+        remaining = bitboards != 0
+        rows, bitboards = rows[remaining], bitboards[remaining]
+    if not row_parts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(row_parts), np.concatenate(square_parts)
+
+
+def _is_attacked(squares, color, occupied, enemy):
+    """Whether each square is attacked by the enemy (M, 6) pieces, for a color's king"""
+    attacked = PAWN_TABLE[color, squares] & enemy[:, PAWN_INDEX]
+    attacked |= KNIGHT_TABLE[squares] & enemy[:, KNIGHT_INDEX]
+    attacked |= KING_TABLE[squares] & enemy[:, KING_INDEX]
+    queens = enemy[:, QUEEN_INDEX]
+    attacked |= _slider_attacks(BISHOP_ARRAYS, squares, occupied) & (enemy[:, BISHOP_INDEX] | queens)
+    attacked |= _slider_attacks(ROOK_ARRAYS, squares, occupied) & (enemy[:, ROOK_INDEX] | queens)
+    return attacked != 0
+
+
+def encode_positions(boards):
+    """Pack Board objects into (squares, side, castling, en_passant) arrays"""
+    boards = list(boards)
+    squares = np.frombuffer(b''.join(bytes(board.squares) for board in boards), dtype=np.int8).reshape(-1, 64)
+    side = np.array([COLOR_INDEX[board.current_player] for board in boards], dtype=np.int8)
+    castling = np.array([board.castling_rights for board in boards], dtype=np.uint8)
+    en_passant = np.array([-1 if board.en_passant_square is None else board.en_passant_square
+                           for board in boards], dtype=np.int8)
+    return squares, side, castling, en_passant
+
+
+def _pieces(squares):
+    """Every piece of every position as (position, square, bitboard index) arrays"""
+    positions, on = np.nonzero(squares)
+    return positions, on, squares[positions, on].astype(np.int64) - 1
+
+
+def piece_bitboards(squares, pieces=None):
+    """(N, 12) uint64 bitboards, in Board.bitboards order, from the square tensor"""
+    positions, on, indices = _pieces(squares) if pieces is None else pieces
+    bitboards = np.zeros((len(squares), 12), dtype=np.uint64)
+    np.add.at(bitboards, (positions, indices), SQUARE_BITS[on])
+    return bitboards
+
+
+def attack_sets(squares, color):
+    """(N,) uint64 bitboards of the squares attacked by color in each position"""
+    squares = np.asarray(squares, dtype=np.int8)
+    color = np.broadcast_to(np.asarray(color, dtype=np.int8), (len(squares),))
+    pieces = _pieces(squares)
+    occupied = piece_bitboards(squares, pieces).sum(axis=1, dtype=np.uint64)
+    all_positions, all_on, all_indices = pieces
+    attacks = np.zeros(len(squares), dtype=np.uint64)
+    for type_index in range(6):
+        selected = all_indices == type_index + 6 * color[all_positions]
+        positions, on = all_positions[selected], all_on[selected]
+        piece_attacks = _piece_attacks(type_index, color[positions], on, occupied[positions])
+        np.bitwise_or.at(attacks, positions, piece_attacks)
+    return attacks
+
+
+def _chunk_moves(squares, side, castling, en_passant):
+    """Legal moves of one chunk of positions, as BatchMoves with chunk-local positions"""
+    count = len(squares)
+    all_positions, all_on, all_indices = pieces = _pieces(squares)
+    bitboards = piece_bitboards(squares, pieces)
+    # Own and enemy bitboards per position, indexed by piece type
+    own_columns = np.arange(6)[None, :] + 6 * side[:, None].astype(np.int64)
+    own = np.take_along_axis(bitboards, own_columns, axis=1)
+    enemy = np.take_along_axis(bitboards, (own_columns + 6) % 12, axis=1)
+    own_occupied = own.sum(axis=1, dtype=np.uint64)
+    enemy_occupied = enemy.sum(axis=1, dtype=np.uint64)
+    occupied = own_occupied | enemy_occupied
+    kings = own[:, KING_INDEX]
+    has_king = kings != 0
+    king_squares = np.zeros(count, dtype=np.int64)
+    own_pieces = all_indices // 6 == side[all_positions]
+    own_kings = own_pieces & (all_indices % 6 == KING_INDEX)
+    king_squares[all_positions[own_kings]] = all_on[own_kings]
+    en_passant_bits = np.where(en_passant >= 0, SQUARE_BITS[en_passant.astype(np.int64) % 64], 0).astype(np.uint64)
+    forward = np.where(side == WHITE_INDEX, -8, 8)
+
+    # Pseudo-legal target sets for every own piece, pawns included
+    positions_list, from_list, targets_list, pawn_list = [], [], [], []
+    own_types = all_indices[own_pieces] % 6
+    own_positions, own_on = all_positions[own_pieces], all_on[own_pieces]
+    for type_index in range(6):
+        selected = own_types == type_index
+        positions, on = own_positions[selected], own_on[selected]
+        if not len(positions):
+            continue
+        piece_side = side[positions]
+        if type_index == PAWN_INDEX:
+            empty = ~occupied[positions]
+            step = forward[positions]
+            single = np.where((empty & SQUARE_BITS[on + step]) != 0, SQUARE_BITS[on + step], 0).astype(np.uint64)
+            start_row = np.where(piece_side == WHITE_INDEX, 6, 1)
+            double_to = np.where(on // 8 == start_row, on + 2 * step, on)
+            double = np.where((single != 0) & (on // 8 == start_row) & ((empty & SQUARE_BITS[double_to]) != 0),
+                              SQUARE_BITS[double_to], 0).astype(np.uint64)
+            captures = PAWN_TABLE[piece_side, on] & (enemy_occupied[positions] | en_passant_bits[positions])
+            targets = single | double | captures
+        else:
+            targets = _piece_attacks(type_index, piece_side, on, occupied[positions]) & ~own_occupied[positions]
+        positions_list.append(positions)
+        from_list.append(on)
+        targets_list.append(targets)
+        pawn_list.append(np.full(len(positions), type_index == PAWN_INDEX))
+
+    positions = np.concatenate(positions_list) if positions_list else np.zeros(0, dtype=np.int64)
+    from_squares = np.concatenate(from_list) if from_list else np.zeros(0, dtype=np.int64)
+    targets = np.concatenate(targets_list) if targets_list else np.zeros(0, dtype=np.uint64)
+    is_pawn = np.concatenate(pawn_list) if pawn_list else np.zeros(0, dtype=bool)
+    rows, to_squares = _bits(targets)
+    positions, from_squares, is_pawn = positions[rows], from_squares[rows], is_pawn[rows]
+
+    # Legality: make each move on the bitboards and test the king square
+    moving_king = from_squares == king_squares[positions]
+    en_passant_capture = is_pawn & (to_squares == en_passant[positions])
+    captured_bits = np.where(en_passant_capture, SQUARE_BITS[(to_squares - forward[positions]) % 64], 0).astype(np.uint64)
+    to_bits = SQUARE_BITS[to_squares]
+    occupied_after = (occupied[positions] & ~SQUARE_BITS[from_squares] & ~captured_bits) | to_bits
+    enemy_after = enemy[positions] & ~(to_bits | captured_bits)[:, None]
+    king_after = np.where(moving_king, to_squares, king_squares[positions])
+    legal = ~has_king[positions] | ~_is_attacked(king_after, side[positions], occupied_after, enemy_after)
+    positions, from_squares, to_squares, is_pawn = positions[legal], from_squares[legal], to_squares[legal], is_pawn[legal]
+
+    # Promotions expand into one move per promotion piece
+    promoting = is_pawn & ((to_squares // 8 == 0) | (to_squares // 8 == 7))
+    repeats = np.where(promoting, len(PROMOTION_CODES), 1)
+    promotions = np.full(len(positions), -1, dtype=np.int8)
+    positions, from_squares, to_squares = (np.repeat(array, repeats) for array in (positions, from_squares, to_squares))
+    promotions = np.repeat(promotions, repeats)
+    expanded = np.repeat(promoting, repeats)
+    promotions[expanded] = np.tile(PROMOTION_CODES, int(promoting.sum()))
+
+    # Castling: rights, rook at home, empty path, and no attacked square on the king's way
+    castle_positions, castle_from, castle_to = [positions], [from_squares], [to_squares]
+    rooks = own[:, ROOK_INDEX]
+    in_check = has_king & _is_attacked(king_squares, side, occupied, enemy)
+    for right, color, home, step, rook_sq, path in (
+            (WHITE_KINGSIDE, WHITE_INDEX, 60, 1, 63, (61, 62)),
+            (WHITE_QUEENSIDE, WHITE_INDEX, 60, -1, 56, (59, 58, 57)),
+            (BLACK_KINGSIDE, BLACK_INDEX, 4, 1, 7, (5, 6)),
+            (BLACK_QUEENSIDE, BLACK_INDEX, 4, -1, 0, (3, 2, 1))):
+        path_bits = sum(1 << square for square in path)
+        candidate = ((side == color) & ((castling & right) != 0) & (king_squares == home) & has_king & ~in_check
+                     & ((rooks & np.uint64(1 << rook_sq)) != 0) & ((occupied & np.uint64(path_bits)) == 0))
+        for square in (home + step, home + 2 * step):
+            candidate &= ~_is_attacked(np.full(count, square), side, occupied, enemy)
+        castle = np.nonzero(candidate)[0]
+        castle_positions.append(castle)
+        castle_from.append(np.full(len(castle), home))
+        castle_to.append(np.full(len(castle), home + 2 * step))
+    promotions = np.concatenate([promotions] + [np.full(len(castle), -1, dtype=np.int8) for castle in castle_positions[1:]])
+    positions, from_squares, to_squares = (np.concatenate(arrays) for arrays in (castle_positions, castle_from, castle_to))
+
+    order = np.argsort(positions, kind='stable')
+    return BatchMoves(positions[order].astype(np.int32), from_squares[order].astype(np.int8),
+                      to_squares[order].astype(np.int8), promotions[order])
+
+
+def generate_legal_moves_batch(squares, side, castling, en_passant, chunk_size=4096):
+    """Legal moves of every position, as BatchMoves sorted by position index"""
+    squares = np.asarray(squares, dtype=np.int8)
+    side = np.asarray(side, dtype=np.int8)
+    castling = np.asarray(castling, dtype=np.uint8)
+    en_passant = np.asarray(en_passant, dtype=np.int8)
+    parts = []
+    for start in range(0, len(squares), chunk_size):
+        stop = start + chunk_size
+        moves = _chunk_moves(squares[start:stop], side[start:stop], castling[start:stop], en_passant[start:stop])
+        parts.append(moves._replace(position=moves.position + start))
+    if not parts:
+        return BatchMoves(np.zeros(0, np.int32), np.zeros(0, np.int8), np.zeros(0, np.int8), np.zeros(0, np.int8))
+    return BatchMoves(*(np.concatenate(column) for column in zip(*parts)))
+
+
+def count_legal_moves(squares, side, castling, en_passant, chunk_size=4096):
+    """(N,) number of legal moves in each position"""
+    moves = generate_legal_moves_batch(squares, side, castling, en_passant, chunk_size)
+    return np.bincount(moves.position, minlength=len(squares))
@@ -0,0 +1,86 @@
+"""
+Bitboard helpers for the chess engine
+Squares are indexed 0-63 as row * 8 + col, matching the (row, col) layout
+used by Board, so square 0 is a8 and square 63 is h1.
+"""
+
+from constants import *
+
+# Color and piece type indices used by the bitboard arrays (plain ints equal
+# to the Color and PieceType values, for the hot paths)
+WHITE_INDEX = int(WHITE_PIECE)
+BLACK_INDEX = int(BLACK_PIECE)
+
+PAWN_INDEX = int(PAWN)
+KNIGHT_INDEX = int(KNIGHT)
+BISHOP_INDEX = int(BISHOP)
+ROOK_INDEX = int(ROOK)
+QUEEN_INDEX = int(QUEEN)
+KING_INDEX = int(KING)
+
+COLOR_INDEX = {color: int(color) for color in Color}
+COLORS = tuple(Color)
+
+TYPE_INDEX = {piece_type: int(piece_type) for piece_type in PieceType}
+PIECE_TYPES = tuple(PieceType)
+
+# Mailbox piece codes: 0 is an empty square, otherwise the bitboard index + 1
+NO_PIECE = 0
+
+# Useful masks
+EMPTY = 0
+FULL = (1 << 64) - 1
+FILE_A = sum(1 << (row * 8) for row in range(8))
+FILE_H = FILE_A << 7
+NOT_FILE_A = FULL ^ FILE_A
+NOT_FILE_H = FULL ^ FILE_H
+ROW_MASKS = [0xFF << (row * 8) for row in range(8)]
+CENTER_MASK = (1 << 27) | (1 << 28) | (1 << 35) | (1 << 36)
+
+
+def piece_index(color, piece_type):
+    """Index of the bitboard holding pieces of this color and type (0-11)"""
+    return COLOR_INDEX[color] * 6 + TYPE_INDEX[piece_type]
+
+
+def piece_code(color, piece_type):
+    """Mailbox code of a piece of this color and type (1-12)"""
+    return piece_index(color, piece_type) + 1
+
+
+def square_index(row, col):
+    """Convert a (row, col) position to a square index"""
+    return row * 8 + col
+
+
+def square_position(square):
+    """Convert a square index to a (row, col) position"""
+    return divmod(square, 8)
+
+
+def popcount(bb):
+    """Number of set bits in a bitboard"""
+    return bb.bit_count()
+
+
+def lsb(bb):
+    """Index of the lowest set bit (bb must be non-zero)"""
+    return (bb & -bb).bit_length() - 1
+
+
+def iter_squares(bb):
+    """Yield the square index of every set bit, lowest first"""
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+def white_pawn_attacks(pawns):
+    """Squares attacked by a set of white pawns (white moves towards row 0)"""
+    return ((pawns & NOT_FILE_A) >> 9) | ((pawns & NOT_FILE_H) >> 7)
+
+
+def black_pawn_attacks(pawns):
+    """Squares attacked by a set of black pawns (black moves towards row 7)"""
+    return ((pawns & NOT_FILE_H) << 9 | (pawns & NOT_FILE_A) << 7) & FULL
@@ -1,82 +1,597 @@
+import functools
+from array import array
 import pygame
-import copy
 from constants import *
 from pieces import *
+from bitboard import *
+import movegen
+from move_cache import MoveCache
+from position import Position
+from move import Move, encode_move, TO_SHIFT, PROMOTION_SHIFT, SQUARE_MASK
+from zobrist import PIECE_KEYS, SIDE_KEY, CASTLING_KEYS, EN_PASSANT_KEYS
+
+# FEN letter of each mailbox piece code, and the code of each letter
+FEN_LETTERS = ' PNBRQKpnbrqk'
+FEN_PIECES = {char: code for code, char in enumerate(FEN_LETTERS) if code != NO_PIECE}
+FEN_EMPTY_RUNS = {str(count): count for count in range(1, 9)}
+FEN_CASTLING_RIGHTS = {'K': WHITE_KINGSIDE, 'Q': WHITE_QUEENSIDE, 'k': BLACK_KINGSIDE, 'q': BLACK_QUEENSIDE}
+FEN_FILES = 'abcdefgh'
+FEN_EN_PASSANT_RANKS = {'w': '6', 'b': '3'}  # Rank of the skipped square, by side to move
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _parse_fen_row(row, row_text):
+    """Piece codes, per-bitboard bits and Zobrist key of one FEN placement row (cached)"""
+    codes = bytearray(8)
+    row_bits = {}
+    key = 0
+    col = 0
+    for char in row_text:
+        if char in FEN_EMPTY_RUNS:
+            col += FEN_EMPTY_RUNS[char]
+            continue
+        code = FEN_PIECES.get(char)
+        if code is None or col > 7:
+            raise ValueError(f"Invalid FEN row: {row_text!r}")
+        index = code - 1
+        square = row * 8 + col
+        codes[col] = code
+        row_bits[index] = row_bits.get(index, 0) | (1 << square)
+        key ^= PIECE_KEYS[index][square]
+        col += 1
+    if col != 8:
+        raise ValueError(f"Invalid FEN row: {row_text!r}")
+    return bytes(codes), tuple(row_bits.items()), key
+
+# Pawns of the side to move that could capture onto a square
+PAWN_CAPTURERS = [black_pawn_attacks, white_pawn_attacks]
+
+# Castling rights kept when a move starts or ends on each square
+CASTLING_RIGHTS_MASK = [ALL_CASTLING_RIGHTS] * 64
+CASTLING_RIGHTS_MASK[0] ^= BLACK_QUEENSIDE
+CASTLING_RIGHTS_MASK[7] ^= BLACK_KINGSIDE
+CASTLING_RIGHTS_MASK[4] ^= BLACK_KINGSIDE | BLACK_QUEENSIDE
+CASTLING_RIGHTS_MASK[56] ^= WHITE_QUEENSIDE
+CASTLING_RIGHTS_MASK[63] ^= WHITE_KINGSIDE
+CASTLING_RIGHTS_MASK[60] ^= WHITE_KINGSIDE | WHITE_QUEENSIDE
+
+# King and rook squares each castling right depends on
+CASTLING_HOME_SQUARES = {right: sum(1 << square for square in range(64) if not CASTLING_RIGHTS_MASK[square] & right)
+                         for right in FEN_CASTLING_RIGHTS.values()}
 
 class Board:
-    def __init__(self):
-        self.board = [[None for _ in range(8)] for _ in range(8)]
+    # Legal moves by position, shared by every board (UI, game loop and AI copies)
+    move_cache = MoveCache()
+    
+    def __init__(self, fen=None):
+        # Mailbox: one piece code per square (see piece_code); Piece objects
+        # are only built on demand by get_piece_at
+        self.squares = bytearray(64)
+        # Bitboard core: one 64-bit set per (color, piece type) plus occupancy
+        self.bitboards = [0] * 12
+        self.occupancy = [0, 0]  # Indexed by WHITE_INDEX / BLACK_INDEX
+        self.occupied = 0
+        self.unmoved = 0  # Squares whose piece has not moved yet (has_moved flags)
+        self.king_squares = [None, None]  # Indexed by WHITE_INDEX / BLACK_INDEX
+        # Attack maps: squares attacked by the piece on each square, updated
+        # incrementally, and per-side unions built from them on demand
+        self.piece_attacks = [0] * 64
+        self._side_attacks = [None, None]
         self.current_player = WHITE_PIECE
+        self.castling_rights = 0
+        self.en_passant_square = None  # Square a pawn skipped over, if capturable
+        self.hash_key = 0  # Zobrist key, updated incrementally
+        self.halfmove_clock = 0  # Plies since the last capture or pawn move
+        self.fullmove_number = 1
         self.selected_piece = None
         self.selected_position = None
         self.valid_moves = []
         self.move_history = []
+        self._undo_stack = []  # Undo records pushed by push_move
+        self._hash_history = []  # Hash key before each move on the undo stack
+        self._snapshots = []  # Position every SNAPSHOT_INTERVAL plies of move_history, for seek
+        self._status = None  # Cached check/mate/stalemate status, see the status property
         self.game_status = "Game in progress"
         self.ai_thinking = False  # Flag to indicate AI is thinking
-        self.setup_initial_position()
+        if fen is None:
+            self.setup_initial_position()
+        else:
+            self.load_fen(fen)
         
     def setup_initial_position(self):
         """Set up the standard chess starting position"""
-        # Place pawns
-        for col in range(8):
-            self.set_piece_at(1, col, Pawn(BLACK_PIECE, (1, col)))
-            self.set_piece_at(6, col, Pawn(WHITE_PIECE, (6, col)))
+        self.load_fen(STARTING_FEN)
+    
+    @classmethod
+    def from_fen(cls, fen):
+        """Create a board holding the position described by a FEN or EPD string"""
+        return cls(fen)
+    
+    def clone(self, history=True):
+        """Independent copy of the position, without the UI selection state
+        
+        With history, the clone can undo moves and see repetitions from before
+        the copy: the history lists are copied, but their entries (undo records,
+        hash keys, Move objects) are never modified, so they are shared.
+        """
+        board = self.__class__.__new__(self.__class__)
+        board.squares = self.squares[:]
+        board.bitboards = self.bitboards[:]
+        board.occupancy = self.occupancy[:]
+        board.occupied = self.occupied
+        board.unmoved = self.unmoved
+        board.king_squares = self.king_squares[:]
+        # Attack maps are replaced rather than changed in place, so they can be shared
+        board.piece_attacks = self.piece_attacks
+        board._side_attacks = self._side_attacks[:]
+        board.current_player = self.current_player
+        board.castling_rights = self.castling_rights
+        board.en_passant_square = self.en_passant_square
+        board.hash_key = self.hash_key
+        board.halfmove_clock = self.halfmove_clock
+        board.fullmove_number = self.fullmove_number
+        board.selected_piece = None
+        board.selected_position = None
+        board.valid_moves = []
+        if history:
+            board.move_history = self.move_history[:]
+            board._undo_stack = self._undo_stack[:]
+            board._hash_history = self._hash_history[:]
+            board._snapshots = self._snapshots[:]
+        else:
+            board.move_history = []
+            board._undo_stack = []
+            board._hash_history = []
+            board._snapshots = []
+        board._status = self._status if history else None
+        board.game_status = self.game_status
+        board.ai_thinking = False
+        return board
+    
+    def __deepcopy__(self, memo):
+        """copy.deepcopy(board) is a clone with full history"""
+        return self.clone()
+    
+    def position(self):
+        """Immutable snapshot of the position, safe to share with other threads"""
+        history = self._hash_history
+        return Position(bytes(self.squares), tuple(self.bitboards), tuple(self.piece_attacks),
+                        self.current_player, self.castling_rights, self.en_passant_square,
+                        self.halfmove_clock, self.fullmove_number, self.unmoved, self.hash_key,
+                        tuple(history[max(len(history) - self.halfmove_clock, 0):]))
+    
+    @classmethod
+    def from_position(cls, position):
+        """Create a board holding a Position snapshot (no undo history, repetitions kept)"""
+        board = cls.__new__(cls)
+        board.king_squares = [None, None]
+        board._set_position(position)
+        board.selected_piece = None
+        board.selected_position = None
+        board.valid_moves = []
+        board.move_history = []
+        board._undo_stack = []
+        board._hash_history = list(position.history)
+        board._snapshots = []
+        board.game_status = "Game in progress"
+        board.ai_thinking = False
+        return board
+    
+    def _set_position(self, position):
+        """Replace the position state (not the history) with a Position snapshot"""
+        self.squares = bytearray(position.squares)
+        self.bitboards = bitboards = list(position.bitboards)
+        white = bitboards[0] | bitboards[1] | bitboards[2] | bitboards[3] | bitboards[4] | bitboards[5]
+        black = bitboards[6] | bitboards[7] | bitboards[8] | bitboards[9] | bitboards[10] | bitboards[11]
+        self.occupancy = [white, black]
+        self.occupied = white | black
+        self.unmoved = position.unmoved
+        self._update_king_squares()
+        self.piece_attacks = list(position.piece_attacks)
+        self._side_attacks = [None, None]
+        self.current_player = position.current_player
+        self.castling_rights = position.castling_rights
+        self.en_passant_square = position.en_passant_square
+        self.hash_key = position.hash_key
+        self.halfmove_clock = position.halfmove_clock
+        self.fullmove_number = position.fullmove_number
+        self._status = None
+    
+    def load_fen(self, fen):
+        """Replace the position with the one described by a FEN or EPD string"""
+        fields = fen.split()
+        rows = fields[0].split('/') if fields else []
+        if len(fields) < 4 or len(rows) != 8:
+            raise ValueError(f"Invalid FEN: {fen!r}")
+        
+        # Piece placement, row 0 (rank 8) first, straight into the mailbox and bitboards
+        squares = bytearray(64)
+        bitboards = [0] * 12
+        key = 0
+        try:
+            for row, row_text in enumerate(rows):
+                row_codes, row_bits, row_key = _parse_fen_row(row, row_text)
+                squares[row * 8:row * 8 + 8] = row_codes
+                for index, bits in row_bits:
+                    bitboards[index] |= bits
+                key ^= row_key
+        except ValueError:
+            raise ValueError(f"Invalid FEN: {fen!r}") from None
+        
+        self.squares = squares
+        self.bitboards = bitboards
+        white = bitboards[0] | bitboards[1] | bitboards[2] | bitboards[3] | bitboards[4] | bitboards[5]
+        black = bitboards[6] | bitboards[7] | bitboards[8] | bitboards[9] | bitboards[10] | bitboards[11]
+        self.occupancy = [white, black]
+        self.occupied = white | black
+        self._update_king_squares()
+        self._compute_attack_maps()
+        
+        # Side to move, castling rights and en passant square
+        if fields[1] == 'w':
+            self.current_player = WHITE_PIECE
+        elif fields[1] == 'b':
+            self.current_player = BLACK_PIECE
+            key ^= SIDE_KEY
+        else:
+            raise ValueError(f"Invalid FEN: {fen!r}")
         
-        # Place other pieces
-        piece_order = [Rook, Knight, Bishop, Queen, King, Bishop, Knight, Rook]
+        rights = 0
+        if fields[2] != '-':
+            for char in fields[2]:
+                if char not in FEN_CASTLING_RIGHTS:
+                    raise ValueError(f"Invalid FEN: {fen!r}")
+                rights |= FEN_CASTLING_RIGHTS[char]
+        self.castling_rights = rights
+        key ^= CASTLING_KEYS[rights]
         
-        for col, piece_class in enumerate(piece_order):
-            self.set_piece_at(0, col, piece_class(BLACK_PIECE, (0, col)))
-            self.set_piece_at(7, col, piece_class(WHITE_PIECE, (7, col)))
+        self.en_passant_square = None
+        if fields[3] != '-':
+            en_passant = fields[3]
+            if (len(en_passant) != 2 or en_passant[0] not in FEN_FILES
+                    or en_passant[1] != FEN_EN_PASSANT_RANKS[fields[1]]):
+                raise ValueError(f"Invalid FEN: {fen!r}")
+            square = square_index(8 - int(en_passant[1]), FEN_FILES.index(en_passant[0]))
+            # Only keep it when a pawn can actually capture, as push_move does
+            us = COLOR_INDEX[self.current_player]
+            if PAWN_CAPTURERS[us](1 << square) & bitboards[us * 6 + PAWN_INDEX]:
+                self.en_passant_square = square
+                key ^= EN_PASSANT_KEYS[square & 7]
+        self.hash_key = key
+        
+        # Move clocks are optional (EPD lines carry operations instead)
+        if len(fields) >= 6 and fields[4].isdigit() and fields[5].isdigit():
+            self.halfmove_clock = int(fields[4])
+            self.fullmove_number = int(fields[5])
+        else:
+            self.halfmove_clock = 0
+            self.fullmove_number = 1
+        
+        self.move_history = []
+        self._undo_stack = []
+        self._hash_history = []
+        self.clear_selection()
+        self._status = None  # Worked out on first use, so bulk FEN loading stays cheap
+        
+        # FEN has no has_moved flags: pawns off their start row have moved, and
+        # so have kings and rooks without a castling right tied to their square
+        unmoved = self.occupied & ~(bitboards[PAWN_INDEX] & ~ROW_MASKS[6])
+        unmoved &= ~(bitboards[6 + PAWN_INDEX] & ~ROW_MASKS[1])
+        castlers = (bitboards[ROOK_INDEX] | bitboards[KING_INDEX]
+                    | bitboards[6 + ROOK_INDEX] | bitboards[6 + KING_INDEX])
+        unmoved &= ~castlers
+        for right, home_squares in CASTLING_HOME_SQUARES.items():
+            if rights & right:
+                unmoved |= castlers & home_squares
+        self.unmoved = unmoved
+        self._snapshots = []
+    
+    def to_fen(self):
+        """Describe the position as a FEN string"""
+        rows = []
+        squares = self.squares
+        for row in range(8):
+            row_text = ''
+            empty = 0
+            for code in squares[row * 8:row * 8 + 8]:
+                if code == NO_PIECE:
+                    empty += 1
+                    continue
+                if empty:
+                    row_text += str(empty)
+                    empty = 0
+                row_text += FEN_LETTERS[code]
+            if empty:
+                row_text += str(empty)
+            rows.append(row_text)
         
+        castling = ''.join(char for char, right in FEN_CASTLING_RIGHTS.items()
+                           if self.castling_rights & right) or '-'
+        if self.en_passant_square is None:
+            en_passant = '-'
+        else:
+            row, col = divmod(self.en_passant_square, 8)
+            en_passant = f"{chr(ord('a') + col)}{8 - row}"
+        side = 'w' if self.current_player == WHITE_PIECE else 'b'
+        return f"{'/'.join(rows)} {side} {castling} {en_passant} {self.halfmove_clock} {self.fullmove_number}"
+    
     def get_piece_at(self, row, col):
-        """Get piece at given position"""
+        """Get piece at given position (built from the mailbox on each call)"""
         if 0 <= row < 8 and 0 <= col < 8:
-            return self.board[row][col]
+            square = row * 8 + col
+            code = self.squares[square]
+            if code != NO_PIECE:
+                color_index, type_index = divmod(code - 1, 6)
+                piece = PIECE_CLASSES[type_index](COLORS[color_index], (row, col))
+                piece.has_moved = not self.unmoved >> square & 1
+                return piece
         return None
     
+    @property
+    def board(self):
+        """Read-only 8x8 grid of Pieces (or None), built from the mailbox on each access"""
+        return [[self.get_piece_at(row, col) for col in range(8)] for row in range(8)]
+    
     def set_piece_at(self, row, col, piece):
         """Place piece at given position"""
         if 0 <= row < 8 and 0 <= col < 8:
-            self.board[row][col] = piece
+            square = square_index(row, col)
+            if self.squares[square] != NO_PIECE:
+                self._remove_piece(square)
             if piece:
                 piece.position = (row, col)
+                self._put_piece(square, piece_code(piece.color, piece.get_piece_type()))
+                if piece.has_moved:
+                    self.unmoved &= ~(1 << square)
+                else:
+                    self.unmoved |= 1 << square
+            self._update_king_squares()
+            self._compute_attack_maps()
+            self._status = None
     
-    def move_piece(self, from_pos, to_pos):
-        """Move piece from one position to another"""
-        from_row, from_col = from_pos
-        to_row, to_col = to_pos
-        
-        piece = self.get_piece_at(from_row, from_col)
-        captured_piece = self.get_piece_at(to_row, to_col)
+    def _update_king_squares(self):
+        """Find both kings again after pieces were placed directly"""
+        for color_index in (WHITE_INDEX, BLACK_INDEX):
+            kings = self.bitboards[color_index * 6 + KING_INDEX]
+            self.king_squares[color_index] = lsb(kings) if kings else None
+    
+    def _compute_attack_maps(self):
+        """Rebuild every attack map from scratch"""
+        squares = self.squares
+        occupied = self.occupied
+        self.piece_attacks = [movegen.attacks_from(code - 1, square, occupied) if code else 0
+                              for square, code in enumerate(squares)]
+        self._side_attacks = [None, None]
+    
+    def _update_attack_maps(self, changed):
+        """Refresh the attack maps after the pieces on the changed squares moved"""
+        # A slider's attacks can only change if it reached one of the changed
+        # squares before the move: the path up to the first changed square on
+        # each ray is the same before and after
+        piece_attacks = self.piece_attacks[:]
+        squares = self.squares
+        occupied = self.occupied
+        bitboards = self.bitboards
+        sliders = (bitboards[BISHOP_INDEX] | bitboards[ROOK_INDEX] | bitboards[QUEEN_INDEX]
+                   | bitboards[6 + BISHOP_INDEX] | bitboards[6 + ROOK_INDEX] | bitboards[6 + QUEEN_INDEX])
+        for square in iter_squares(sliders & ~changed):
+            if piece_attacks[square] & changed:
+                piece_attacks[square] = movegen.attacks_from(squares[square] - 1, square, occupied)
+        for square in iter_squares(changed):
+            code = squares[square]
+            piece_attacks[square] = movegen.attacks_from(code - 1, square, occupied) if code else 0
+        self.piece_attacks = piece_attacks
+        self._side_attacks = [None, None]
+    
+    def attacked_squares(self, color):
+        """Bitboard of squares attacked by color (built from the attack maps)"""
+        color_index = COLOR_INDEX[color]
+        attacks = self._side_attacks[color_index]
+        if attacks is None:
+            attacks = 0
+            piece_attacks = self.piece_attacks
+            for square in iter_squares(self.occupancy[color_index]):
+                attacks |= piece_attacks[square]
+            self._side_attacks[color_index] = attacks
+        return attacks
+    
+    def _put_piece(self, square, code):
+        """Put a piece code on an empty square, updating bitboards and hash"""
+        index = code - 1
+        bit = 1 << square
+        self.squares[square] = code
+        self.bitboards[index] |= bit
+        self.occupancy[index // 6] |= bit
+        self.occupied |= bit
+        self.hash_key ^= PIECE_KEYS[index][square]
+    
+    def _remove_piece(self, square):
+        """Take the piece off an occupied square and return its code"""
+        code = self.squares[square]
+        index = code - 1
+        bit = 1 << square
+        self.squares[square] = NO_PIECE
+        self.bitboards[index] ^= bit
+        self.occupancy[index // 6] ^= bit
+        self.occupied ^= bit
+        self.hash_key ^= PIECE_KEYS[index][square]
+        return code
+    
+    def _set_castling_rights(self, rights):
+        """Replace the castling rights, keeping the hash key in step"""
+        self.hash_key ^= CASTLING_KEYS[self.castling_rights] ^ CASTLING_KEYS[rights]
+        self.castling_rights = rights
+    
+    def _set_en_passant_square(self, square):
+        """Replace the en passant square, keeping the hash key in step"""
+        if self.en_passant_square is not None:
+            self.hash_key ^= EN_PASSANT_KEYS[self.en_passant_square & 7]
+        if square is not None:
+            self.hash_key ^= EN_PASSANT_KEYS[square & 7]
+        self.en_passant_square = square
+    
+    def compute_hash_key(self):
+        """Compute the Zobrist key from scratch (hash_key is kept incrementally)"""
+        key = CASTLING_KEYS[self.castling_rights]
+        for index, bb in enumerate(self.bitboards):
+            for square in iter_squares(bb):
+                key ^= PIECE_KEYS[index][square]
+        if self.current_player == BLACK_PIECE:
+            key ^= SIDE_KEY
+        if self.en_passant_square is not None:
+            key ^= EN_PASSANT_KEYS[self.en_passant_square & 7]
+        return key
+    
+    def __hash__(self):
+        return self.hash_key
+    
+    def __eq__(self, other):
+        if not isinstance(other, Board):
+            return NotImplemented
+        return self.hash_key == other.hash_key
+    
+    def get_bitboard(self, color, piece_type):
+        """Get the bitboard of all pieces of one color and type"""
+        return self.bitboards[piece_index(color, piece_type)]
+    
+    def get_occupancy(self, color):
+        """Get the bitboard of all squares occupied by one color"""
+        return self.occupancy[COLOR_INDEX[color]]
+    
+    def iter_pieces(self, color):
+        """Yield (row, col, piece) for every piece of the given color"""
+        for square in iter_squares(self.occupancy[COLOR_INDEX[color]]):
+            row, col = square_position(square)
+            yield row, col, self.get_piece_at(row, col)
+    
+    def move_piece(self, from_pos, to_pos, promotion=None):
+        """Move piece from one position to another (a promoting pawn becomes a queen unless told otherwise)"""
+        from_sq = square_index(*from_pos)
+        to_sq = square_index(*to_pos)
+        code = self.squares[from_sq]
         
-        if piece:
-            # Record move before making it
-            from move import Move
-            move = Move(from_pos, to_pos, piece, captured_piece)
-            self.move_history.append(move)
-            
-            # Make the move
-            self.set_piece_at(to_row, to_col, piece)
-            self.set_piece_at(from_row, from_col, None)
-            piece.move_to((to_row, to_col))
+        if code:
+            if not self.move_history:
+                # Ply 0 is taken at the first move, so setup edits made before it count
+                self._snapshots = [self.position()]
             
-            # Check for pawn promotion
-            if piece.get_piece_type() == PAWN:
-                promotion_row = 0 if piece.color == WHITE_PIECE else 7
-                if to_row == promotion_row:
-                    # For now, automatically promote to queen
-                    from pieces.queen import Queen
-                    promoted_piece = Queen(piece.color, (to_row, to_col))
-                    self.set_piece_at(to_row, to_col, promoted_piece)
+            # Record move before making it
+            move = encode_move(from_sq, to_sq, promotion)
+            self.move_history.append(Move(move, code, self.squares[to_sq]))
             
-            self.switch_player()
+            # Make the move (handles castling and promotion)
+            self.push_move(move)
+            if len(self.move_history) % SNAPSHOT_INTERVAL == 0:
+                self._snapshots.append(self.position())
+            self.update_status()
             return True
         return False
     
+    def push_move(self, move):
+        """Make a packed move in place, recording what pop_move needs to restore it exactly"""
+        from_sq = move & SQUARE_MASK
+        to_sq = move >> TO_SHIFT & SQUARE_MASK
+        squares = self.squares
+        code = squares[from_sq]
+        captured = squares[to_sq]
+        capture_sq = to_sq
+        color_index, type_index = divmod(code - 1, 6)
+        castling_rook = None
+        saved_state = (self.castling_rights, self.en_passant_square, self.hash_key,
+                       self.halfmove_clock, self.unmoved, self.piece_attacks, self._side_attacks)
+        
+        if type_index == PAWN_INDEX and to_sq == self.en_passant_square:
+            # En passant: the captured pawn sits beside the destination
+            capture_sq = to_sq + 8 if color_index == WHITE_INDEX else to_sq - 8
+            captured = squares[capture_sq]
+        if captured:
+            self._remove_piece(capture_sq)
+        
+        # Make the move
+        self._remove_piece(from_sq)
+        moved = (1 << from_sq) | (1 << to_sq)
+        
+        if type_index == KING_INDEX:
+            self._put_piece(to_sq, code)
+            self.king_squares[color_index] = to_sq
+        
+        if type_index == KING_INDEX and abs(to_sq - from_sq) == 2:
+            # Castling: move the rook too
+            rook_from, rook_to = (from_sq + 3, from_sq + 1) if to_sq > from_sq else (from_sq - 4, from_sq - 1)
+            if squares[rook_from]:
+                castling_rook = (rook_from, rook_to)
+                self._put_piece(rook_to, self._remove_piece(rook_from))
+                moved |= (1 << rook_from) | (1 << rook_to)
+        elif type_index == PAWN_INDEX and to_sq >> 3 == (0 if color_index == WHITE_INDEX else 7):
+            # Pawn promotion, to a queen unless told otherwise
+            self._put_piece(to_sq, color_index * 6 + (move >> PROMOTION_SHIFT or QUEEN_INDEX) + 1)
+        elif type_index != KING_INDEX:
+            self._put_piece(to_sq, code)
+        self.unmoved &= ~moved
+        self._update_attack_maps(moved | (1 << capture_sq))
+        
+        # Moving a king or rook, or capturing a rook at home, loses castling rights
+        rights = self.castling_rights & CASTLING_RIGHTS_MASK[from_sq] & CASTLING_RIGHTS_MASK[to_sq]
+        if rights != self.castling_rights:
+            self._set_castling_rights(rights)
+        
+        # A double pawn push next to an enemy pawn opens an en passant capture
+        en_passant_square = None
+        if type_index == PAWN_INDEX and abs(to_sq - from_sq) == 16:
+            enemy_pawns = self.bitboards[(color_index ^ 1) * 6 + PAWN_INDEX]
+            neighbours = ((1 << to_sq) & NOT_FILE_A) >> 1 | ((1 << to_sq) & NOT_FILE_H) << 1
+            if enemy_pawns & neighbours:
+                en_passant_square = (from_sq + to_sq) // 2
+        if en_passant_square != self.en_passant_square:
+            self._set_en_passant_square(en_passant_square)
+        
+        # Move clocks
+        if type_index == PAWN_INDEX or captured:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if color_index == BLACK_INDEX:
+            self.fullmove_number += 1
+        
+        self._undo_stack.append((from_sq, to_sq, code, captured, capture_sq, castling_rook) + saved_state)
+        self._hash_history.append(saved_state[2])
+        self.switch_player()
+    
+    def pop_move(self):
+        """Take back the last move made with push_move"""
+        (from_sq, to_sq, code, captured, capture_sq, castling_rook,
+         castling_rights, en_passant_square, hash_key, halfmove_clock, unmoved,
+         self.piece_attacks, self._side_attacks) = self._undo_stack.pop()
+        self._hash_history.pop()
+        
+        self.switch_player()
+        
+        # Put the castling rook back
+        if castling_rook:
+            rook_from, rook_to = castling_rook
+            self._put_piece(rook_from, self._remove_piece(rook_to))
+        
+        # Restore the moved piece (replacing any promoted piece) and the captured piece
+        self._remove_piece(to_sq)
+        self._put_piece(from_sq, code)
+        if (code - 1) % 6 == KING_INDEX:
+            self.king_squares[(code - 1) // 6] = from_sq
+        if captured:
+            self._put_piece(capture_sq, captured)
+        
+        self.castling_rights = castling_rights
+        self.en_passant_square = en_passant_square
+        self.hash_key = hash_key
+        self.halfmove_clock = halfmove_clock
+        self.unmoved = unmoved
+        if code - 1 >= 6:
+            self.fullmove_number -= 1
+    
     def switch_player(self):
         """Switch current player"""
         self.current_player = BLACK_PIECE if self.current_player == WHITE_PIECE else WHITE_PIECE
+        self.hash_key ^= SIDE_KEY
+        self._status = None  # Worked out again on first use (push_move and pop_move come through here)
     
     def is_valid_position(self, row, col):
         """Check if position is within board bounds"""
@@ -89,7 +604,12 @@ class Board:
         if piece and piece.color == self.current_player:
             self.selected_piece = piece
             self.selected_position = (row, col)
-            self.valid_moves = piece.get_valid_moves(self)
+            
+            # Only legal destinations (promotion choices share a square)
+            square = square_index(row, col)
+            destinations = [square_position(move >> TO_SHIFT & SQUARE_MASK)
+                            for move in self.generate_legal_moves() if move & SQUARE_MASK == square]
+            self.valid_moves = list(dict.fromkeys(destinations))
         else:
             self.clear_selection()
     
@@ -99,143 +619,157 @@ class Board:
         self.selected_position = None
         self.valid_moves = []
     
-    def make_move(self, to_row, to_col):
-        """Attempt to make a move to the specified position"""
+    def make_move(self, to_row, to_col, promotion=None):
+        """Attempt to make a move to the specified position, promoting to a queen by default"""
         if self.selected_piece and (to_row, to_col) in self.valid_moves:
-            from_row, from_col = self.selected_position
-            
-            # Handle castling
-            if self.selected_piece.get_piece_type() == KING and abs(to_col - from_col) == 2:
-                # Kingside castling
-                if to_col > from_col:
-                    # Move the rook too
-                    rook = self.get_piece_at(from_row, 7)
-                    if rook:
-                        self.set_piece_at(from_row, 5, rook)
-                        self.set_piece_at(from_row, 7, None)
-                        rook.move_to((from_row, 5))
-                # Queenside castling
-                else:
-                    # Move the rook too
-                    rook = self.get_piece_at(from_row, 0)
-                    if rook:
-                        self.set_piece_at(from_row, 3, rook)
-                        self.set_piece_at(from_row, 0, None)
-                        rook.move_to((from_row, 3))
-            
-            # Make the move
-            self.move_piece(self.selected_position, (to_row, to_col))
+            # Make the move (castling and promotion are handled by push_move)
+            self.move_piece(self.selected_position, (to_row, to_col), promotion)
             self.clear_selection()
             return True
         return False
+    def generate_legal_moves(self, color=None):
+        """Array of packed legal moves for color (default: side to move), the caller's own to modify"""
+        if color is not None and color != self.current_player:
+            # The position key includes the side to move, so only its moves are cached
+            return movegen.generate_legal_moves(self, color)
+        cached = self.move_cache.get(self.hash_key)
+        if cached is None:
+            moves = movegen.generate_legal_moves(self)
+            self.move_cache.put(self.hash_key, moves)
+        else:
+            moves = array('H')
+            moves.frombytes(cached)
+        return moves
+    
+    def iter_legal_moves(self, color=None, captures_first=False):
+        """Iterate legal moves lazily, optionally captures first, reusing cached moves if any"""
+        if not captures_first and (color is None or color == self.current_player):
+            # Peek only: a lazily generated list is never complete enough to store
+            moves = self.move_cache.peek(self.hash_key)
+            if moves is not None:
+                return iter(memoryview(moves).cast('H'))
+        return movegen.iter_legal_moves(self, color, captures_first)
+    
+    def has_legal_moves(self, color=None):
+        """Check if color (default: side to move) has any legal move, stopping at the first"""
+        for move in self.iter_legal_moves(color):
+            return True
+        return False
+    
+    def is_square_attacked(self, square, by_color):
+        """Check if any piece of by_color attacks the given square index"""
+        return self.attacked_squares(by_color) >> square & 1 == 1
+    
     def is_in_check(self, color):
         """Check if the given color's king is in check"""
-        # Find king position
-        king_position = None
-        for row in range(8):
-            for col in range(8):
-                piece = self.get_piece_at(row, col)
-                if piece and piece.color == color and piece.get_piece_type() == KING:
-                    king_position = (row, col)
-                    break
-            if king_position:
-                break
-        
-        if not king_position:
+        # King position is tracked incrementally
+        king_sq = self.king_squares[color]
+        if king_sq is None:
             return False  # No king found (shouldn't happen in a real game)
         
         # Check if any opponent piece can attack the king
         opponent_color = BLACK_PIECE if color == WHITE_PIECE else WHITE_PIECE
-        for row in range(8):
-            for col in range(8):
-                piece = self.get_piece_at(row, col)
-                if piece and piece.color == opponent_color:
-                    # For now, skip the check to avoid recursion
-                    # This is a simplified version to avoid recursion issues
-                    if piece.get_piece_type() == PAWN:
-                        # Check pawn attack pattern directly
-                        pawn_row, pawn_col = piece.position
-                        direction = -1 if piece.is_white() else 1
-                        attack_positions = [(pawn_row + direction, pawn_col - 1), 
-                                           (pawn_row + direction, pawn_col + 1)]
-                        if king_position in attack_positions:
-                            return True
-                    # Add other piece attack patterns as needed
-        
-        return False
+        return self.is_square_attacked(king_sq, opponent_color)
     
     def is_checkmate(self, color):
         """Check if the given color is in checkmate"""
-        if not self.is_in_check(color):
-            return False
-        
-        # Try all possible moves for all pieces of this color
-        for row in range(8):
-            for col in range(8):
-                piece = self.get_piece_at(row, col)
-                if piece and piece.color == color:
-                    for move_pos in piece.get_valid_moves(self):
-                        # Try the move
-                        temp_board = self._simulate_move((row, col), move_pos)
-                        
-                        # If this move gets out of check, it's not checkmate
-                        if not temp_board.is_in_check(color):
-                            return False
-        
-        # No move gets out of check
-        return True
+        return self.is_in_check(color) and not self.has_legal_moves(color)
     
     def is_stalemate(self, color):
         """Check if the given color is in stalemate"""
-        if self.is_in_check(color):
-            return False
-        
-        # Check if any legal move exists
-        for row in range(8):
-            for col in range(8):
-                piece = self.get_piece_at(row, col)
-                if piece and piece.color == color:
-                    valid_moves = piece.get_valid_moves(self)
-                    if valid_moves:
-                        return False
-        
         # No legal moves and not in check = stalemate
-        return True
-    
-    def _simulate_move(self, from_pos, to_pos):
-        """Simulate a move to check for check"""
-        temp_board = copy.deepcopy(self)
-        
-        from_row, from_col = from_pos
-        to_row, to_col = to_pos
-        piece = temp_board.get_piece_at(from_row, from_col)
-        
-        if piece:
-            temp_board.set_piece_at(to_row, to_col, piece)
-            temp_board.set_piece_at(from_row, from_col, None)
-            piece.position = (to_row, to_col)
-        
-        return temp_board
+        return not self.is_in_check(color) and not self.has_legal_moves(color)
     
     def undo_move(self):
         """Undo the last move"""
         if not self.move_history:
             return False
         
-        move = self.move_history.pop()
-        
-        # Restore the piece to its original position
-        self.set_piece_at(move.from_pos[0], move.from_pos[1], move.piece)
-        
-        # Restore captured piece if any
-        self.set_piece_at(move.to_pos[0], move.to_pos[1], move.captured_piece)
+        if len(self.move_history) % SNAPSHOT_INTERVAL == 0:
+            self._snapshots.pop()
+        self.move_history.pop()
         
-        # Update piece state
-        move.piece.position = move.from_pos
-        if len(self.move_history) == 0 or self.move_history[-1].piece != move.piece:
-            move.piece.has_moved = False
+        # Restore pieces, castling rook, promotion and has_moved flags exactly
+        self.pop_move()
+        self.update_status()
         
-        # Switch back to previous player
-        self.switch_player()
-        
-        return True
\ No newline at end of file
+        return True
+    
+    def position_at(self, ply):
+        """Position after the first ply moves of move_history, without changing the board"""
+        if not 0 <= ply <= len(self.move_history):
+            raise ValueError(f"No ply {ply} in a game of {len(self.move_history)} plies")
+        if ply == len(self.move_history):
+            return self.position()
+        # Replay at most SNAPSHOT_INTERVAL - 1 moves from the nearest snapshot
+        snapshot = ply // SNAPSHOT_INTERVAL
+        position = self._snapshots[snapshot]
+        if ply % SNAPSHOT_INTERVAL == 0:
+            return position
+        board = Board.from_position(position)
+        for played in self.move_history[snapshot * SNAPSHOT_INTERVAL:ply]:
+            board.push_move(played.move)
+        return board.position()
+    
+    def seek(self, ply):
+        """Take the game back to the given ply at once, dropping the moves after it"""
+        dropped = len(self.move_history) - ply
+        position = self.position_at(ply)
+        if dropped:
+            self._set_position(position)
+            del self.move_history[ply:]
+            del self._undo_stack[len(self._undo_stack) - dropped:]
+            del self._hash_history[len(self._hash_history) - dropped:]
+            del self._snapshots[ply // SNAPSHOT_INTERVAL + 1:]
+            self.clear_selection()
+            self.update_status()
+    
+    def repetition_count(self):
+        """How many times the current position has occurred, this time included"""
+        key = self.hash_key
+        history = self._hash_history
+        count = 1
+        # Only positions since the last capture or pawn move can come back,
+        # and only those with the same side to move (every second ply)
+        oldest = max(len(history) - self.halfmove_clock, 0)
+        for index in range(len(history) - 2, oldest - 1, -2):
+            if history[index] == key:
+                count += 1
+        return count
+    
+    def is_repetition(self):
+        """Check if the current position occurred before (a draw for search purposes)"""
+        key = self.hash_key
+        history = self._hash_history
+        oldest = max(len(history) - self.halfmove_clock, 0)
+        for index in range(len(history) - 2, oldest - 1, -2):
+            if history[index] == key:
+                return True
+        return False
+    
+    def is_fifty_move_draw(self):
+        """Check if fifty moves by each side passed without a capture or pawn move"""
+        return self.halfmove_clock >= 100
+    
+    @property
+    def status(self):
+        """Game status of the position (IN_PROGRESS, CHECK, or a GAME_OVER_STATUSES value)"""
+        if self._status is None:
+            self.update_status()
+        return self._status
+    
+    def update_status(self):
+        """Work out check, checkmate, stalemate or a draw for the side to move and cache it"""
+        in_check = self.is_in_check(self.current_player)
+        # The full list, so the cache has it when the UI asks for this position's moves
+        if not self.generate_legal_moves():
+            self._status = CHECKMATE if in_check else STALEMATE
+        elif self.repetition_count() >= 3:
+            self._status = THREEFOLD_REPETITION
+        elif self.is_fifty_move_draw():
+            self._status = FIFTY_MOVE_RULE
+        elif in_check:
+            self._status = CHECK
+        else:
+            self._status = IN_PROGRESS
+        return self._status
\ No newline at end of file
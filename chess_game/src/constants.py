@@ -1,4 +1,5 @@
 import pygame
+from enum import IntEnum
 
 # Board dimensions
 BOARD_SIZE = 8
@@ -38,20 +39,68 @@ LAST_MOVE_COLOR = (156, 39, 176, 120)    # Purple for last move
 GRADIENT_START = (245, 245, 255)  # Slightly blue-tinted white
 GRADIENT_END = (225, 225, 240)    # Light blue-gray
 
-# Piece colors
-WHITE_PIECE = 'white'
-BLACK_PIECE = 'black'
+class Color(IntEnum):
+    """Side to move / piece color; the value is the bitboard color index"""
+    WHITE = 0
+    BLACK = 1
+    
+    def __str__(self):
+        return self.name.lower()
+
+
+class PieceType(IntEnum):
+    """Kind of piece; the value is the bitboard type index"""
+    PAWN = 0
+    KNIGHT = 1
+    BISHOP = 2
+    ROOK = 3
+    QUEEN = 4
+    KING = 5
+    
+    def __str__(self):
+        return self.name.lower()
+
+
+# Piece colors (str() gives the old 'white' / 'black' names)
+WHITE_PIECE = Color.WHITE
+BLACK_PIECE = Color.BLACK
 
 # Starting positions
 STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
 
-# Piece types
-PAWN = 'pawn'
-ROOK = 'rook'
-KNIGHT = 'knight'
-BISHOP = 'bishop'
-QUEEN = 'queen'
-KING = 'king'
+# Piece types (str() gives the old 'pawn', 'rook', ... names)
+PAWN = PieceType.PAWN
+ROOK = PieceType.ROOK
+KNIGHT = PieceType.KNIGHT
+BISHOP = PieceType.BISHOP
+QUEEN = PieceType.QUEEN
+KING = PieceType.KING
+
+# Castling rights (bit flags)
+WHITE_KINGSIDE = 1
+WHITE_QUEENSIDE = 2
+BLACK_KINGSIDE = 4
+BLACK_QUEENSIDE = 8
+ALL_CASTLING_RIGHTS = 15
+
+# Game status of a position (Board.status)
+IN_PROGRESS = 'in_progress'
+CHECK = 'check'
+CHECKMATE = 'checkmate'
+STALEMATE = 'stalemate'
+THREEFOLD_REPETITION = 'threefold_repetition'
+FIFTY_MOVE_RULE = 'fifty_move_rule'
+GAME_OVER_STATUSES = (CHECKMATE, STALEMATE, THREEFOLD_REPETITION, FIFTY_MOVE_RULE)
+
+# Legal move cache size (positions kept, least recently used dropped first)
+MOVE_CACHE_CAPACITY = 8192
+
+# Game history keeps a position snapshot every this many plies, so any ply
+# can be reached by replaying fewer moves than this
+SNAPSHOT_INTERVAL = 16
+
+# AI transposition table size in megabytes (allocated up front)
+TRANSPOSITION_TABLE_MB = 16
 
 # Piece values (for AI evaluation)
 PIECE_VALUES = {
@@ -24,6 +24,7 @@ class Game:
         self.ai_player = AIPlayer(difficulty='medium')
         self.ai_color = BLACK_PIECE  # AI plays as black by default
         self.ai_thread = None
+        self.ai_result = None  # (thread, position searched, move) handed over by the AI thread
         
         self.running = True
         self.game_over = False
@@ -60,6 +61,7 @@ class Game:
                 elif event.key == pygame.K_z:
                     # Undo last move with Z key (undo twice if playing against AI)
                     if self.use_ai:
+                        self._cancel_ai_move()  # Any search running is for the position being undone
                         # Undo both AI's move and player's move
                         self.board.undo_move()
                         if self.board.current_player == self.ai_color:
@@ -75,45 +77,77 @@ class Game:
     
     def update(self):
         """Update game state"""
-        # Check for checkmate or stalemate
+        if self.ai_result is not None:
+            self._apply_ai_move()
+        
+        # The board works out check, checkmate and stalemate once per move,
+        # undo or reset; frames only read the cached result
+        status = self.board.status
+        self.game_over = status in GAME_OVER_STATUSES
+        if status == CHECKMATE:
+            winner = "White" if self.board.current_player == BLACK_PIECE else "Black"
+            self.winner = winner
+            self.board.game_status = f"{winner} wins by checkmate!"
+        elif status == STALEMATE:
+            self.winner = None
+            self.board.game_status = "Draw by stalemate!"
+        elif status == THREEFOLD_REPETITION:
+            self.winner = None
+            self.board.game_status = "Draw by threefold repetition!"
+        elif status == FIFTY_MOVE_RULE:
+            self.winner = None
+            self.board.game_status = "Draw by fifty-move rule!"
+        elif status == CHECK:
+            self.board.game_status = f"{str(self.board.current_player).capitalize()} is in check!"
+        elif self.board.ai_thinking:
+            self.board.game_status = "AI is thinking..."
+        else:
+            self.board.game_status = "Game in progress"
+        
         if not self.game_over:
-            if self.board.is_checkmate(self.board.current_player):
-                self.game_over = True
-                winner = "White" if self.board.current_player == BLACK_PIECE else "Black"
-                self.winner = winner
-                self.board.game_status = f"{winner} wins by checkmate!"
-            elif self.board.is_stalemate(self.board.current_player):
-                self.game_over = True
-                self.board.game_status = "Draw by stalemate!"
-            elif self.board.is_in_check(self.board.current_player):
-                self.board.game_status = f"{self.board.current_player.capitalize()} is in check!"
-            else:
-                if self.board.ai_thinking:
-                    self.board.game_status = "AI is thinking..."
-                else:
-                    self.board.game_status = "Game in progress"
-            
             # Check if it's AI's turn
             if (self.use_ai and 
                 self.board.current_player == self.ai_color and 
                 not self.game_over and 
                 not self.board.ai_thinking and
                 self.ai_thread is None):
-                self.board.ai_thinking = True
-                self.ai_thread = threading.Thread(target=self._make_ai_move)
-                self.ai_thread.daemon = True
-                self.ai_thread.start()
+                self._start_ai_move()
+    
+    def _start_ai_move(self):
+        """Search for the AI's move on a snapshot of the board in a separate thread"""
+        self.board.ai_thinking = True
+        # The search is created here, so a stop() before the thread gets to it still counts
+        search = self.ai_player.new_search()
+        self.ai_thread = threading.Thread(target=self._make_ai_move, args=(self.board.position(), search))
+        self.ai_thread.daemon = True
+        self.ai_thread.start()
     
-    def _make_ai_move(self):
-        """Make an AI move in a separate thread"""
+    def _cancel_ai_move(self):
+        """Stop the AI's search and drop its result, handing input back to the player"""
+        self.ai_player.stop()
+        self.ai_thread = None  # The thread's result no longer matches and is ignored
+        self.board.ai_thinking = False
+    
+    def _make_ai_move(self, position, search):
+        """Find an AI move in a separate thread"""
         # Add a small delay to make the AI seem like it's thinking
         time.sleep(0.5)
         
-        # Get AI's move
-        move = self.ai_player.get_move(self.board)
+        # The thread only reads its own immutable snapshot; the main thread
+        # plays the move, so the live board is never touched from here
+        self.ai_result = (threading.current_thread(), position, self.ai_player.get_move(position, search))
+    
+    def _apply_ai_move(self):
+        """Play the move found by the AI thread, unless the board changed meanwhile"""
+        thread, position, move = self.ai_result
+        self.ai_result = None
+        if thread is not self.ai_thread:
+            return  # A search started before a reset; a newer one is running
+        self.ai_thread = None
         
-        if move:
-            from_pos, to_pos = move
+        # Undo or reset while the AI was thinking makes the move stale
+        if move and position == self.board.position():
+            from_pos, to_pos, promotion = move
             
             # Select the piece
             row, col = from_pos
@@ -121,11 +155,10 @@ class Game:
             
             # Make the move
             to_row, to_col = to_pos
-            self.board.make_move(to_row, to_col)
+            self.board.make_move(to_row, to_col, promotion)
         
         # Reset AI thinking flags
         self.board.ai_thinking = False
-        self.ai_thread = None
     
     def render(self):
         """Render the game using enhanced renderer"""
@@ -133,16 +166,14 @@ class Game:
     
     def reset_game(self):
         """Reset the game to initial state"""
+        self._cancel_ai_move()  # A search for the old game can end now
         self.board = Board()
         self.game_over = False
         self.winner = None
         
         # If AI is enabled and it's black's turn, make AI move
         if self.use_ai and self.board.current_player == self.ai_color:
-            self.board.ai_thinking = True
-            self.ai_thread = threading.Thread(target=self._make_ai_move)
-            self.ai_thread.daemon = True
-            self.ai_thread.start()
+            self._start_ai_move()
     
     def toggle_ai(self):
         """Toggle AI opponent on/off"""
@@ -150,10 +181,7 @@ class Game:
         
         # If turning on AI and it's AI's turn, make a move
         if self.use_ai and self.board.current_player == self.ai_color and not self.game_over:
-            self.board.ai_thinking = True
-            self.ai_thread = threading.Thread(target=self._make_ai_move)
-            self.ai_thread.daemon = True
-            self.ai_thread.start()
+            self._start_ai_move()
     
     def cycle_ai_difficulty(self):
         """Cycle through AI difficulty levels"""
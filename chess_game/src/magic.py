@@ -0,0 +1,133 @@
+"""
+Magic bitboard sliding attacks
+Rook and bishop attacks are looked up in per-square tables indexed by
+((occupied & mask) * magic) >> shift, so a slider's attack set costs a
+mask, a multiply, a shift and an index. Queens combine both tables.
+The magic numbers below were found with find_magic() and are fixed, so
+only the tables are filled in at import.
+"""
+
+import random
+from attack_tables import DIRECTIONS, ROOK_DIRECTIONS, BISHOP_DIRECTIONS, ray_attacks
+
+MASK64 = (1 << 64) - 1
+
+ROOK_MAGICS = (
+    0x128012c0008000e0, 0x0240002000401001, 0x4100200041001008, 0x8280100008018004,
+    0x2080080002040080, 0x1300010004008208, 0x04000208a9101408, 0x020000204a018f04,
+    0x1080800040008020, 0x0000c01000402001, 0x0080808010002000, 0x0408800800801000,
+    0x0010800801040080, 0x4804800400804200, 0x0304800d00800200, 0x010200040081006a,
+    0x8280044020084000, 0x042000c010004021, 0x2010002004080020, 0x0040210010000900,
+    0x0008004004020041, 0x0004008080040200, 0x1c20040070610208, 0x1020a20000508104,
+    0x0100c00380008120, 0x4001200280400080, 0x0200100080200080, 0x0000401200082200,
+    0xc02c080080040080, 0x0840040080020080, 0x2102004040800100, 0x0042079a00004104,
+    0x0000400424800280, 0x4820100020400040, 0x5010002000801880, 0x9061080081801002,
+    0x208a050011000800, 0x000200080e003094, 0xa010018204003008, 0x2000288042001401,
+    0x400181c000228000, 0x0200402010004000, 0x8388928600420021, 0x400021001001000a,
+    0x2100080011010004, 0x1002020004008080, 0x0802000804020001, 0x88004410408a0001,
+    0x010508c030800100, 0x4000400080310100, 0x0030200010048080, 0x2000800800100080,
+    0x0100040008008080, 0x0022000204008080, 0x0108020170284400, 0x1001010084004200,
+    0x0004890141902202, 0x0100881100220042, 0x0100102001000841, 0x4408050020081001,
+    0x0002008884201002, 0x2002000490410802, 0x0020014800900204, 0x0100082081044402,
+)
+
+BISHOP_MAGICS = (
+    0x0010104088840042, 0x0110104081004062, 0x0091142082000100, 0x0108208821008100,
+    0x0101104000080000, 0x010104200404001c, 0x0c01040202c00010, 0x0001004800841080,
+    0xca8b46100e280102, 0x001010d00085024c, 0x4180089881020120, 0x8010082050411000,
+    0x0800020210100000, 0x0002120905201200, 0xc000040404040510, 0x0110410101100200,
+    0x0042201408020c27, 0xa882000404440c20, 0x0002000102040100, 0x800200202202c200,
+    0x4002005012101401, 0x2441014880600200, 0x0214020104018400, 0x000180004414410a,
+    0x0105410c10020800, 0x0004200084013400, 0x200582045004001b, 0x1000404004010200,
+    0x0001001081004021, 0x2400430202008628, 0x000604c144230800, 0x04004840008a1804,
+    0x4010045000220210, 0x2012100400500120, 0x10001c0205900081, 0x0020880800360a00,
+    0x8500460020060080, 0x0420008209010110, 0x0010020250008c00, 0x8010a40100004104,
+    0x00008208400022c8, 0x0008410450402100, 0x0008920110004104, 0x43a8011044002024,
+    0x0029102021900602, 0x2270101000212040, 0x0020c41112004040, 0x3004840550c42200,
+    0x5002022202404480, 0x0402822309200840, 0x0032010423240048, 0x2000ca0384110008,
+    0x4001140410440000, 0x2092e50810011010, 0x0140040852005041, 0x00200200c1010104,
+    0x40120202020104e0, 0xa000010042300500, 0x400048004a009001, 0x4200800400411081,
+    0x0010040604105400, 0x0107004210024080, 0x0004423004210040, 0xc220023088010040,
+)
+
+
+def relevant_occupancy_mask(square, directions):
+    """Squares whose occupancy can change the attacks from square (board edges excluded)"""
+    mask = 0
+    row, col = divmod(square, 8)
+    for direction in directions:
+        dr, dc = DIRECTIONS[direction]
+        new_row, new_col = row + dr, col + dc
+        # A blocker on the last square of a ray changes nothing
+        while 0 <= new_row + dr < 8 and 0 <= new_col + dc < 8:
+            mask |= 1 << (new_row * 8 + new_col)
+            new_row += dr
+            new_col += dc
+    return mask
+
+
+def occupancy_subsets(mask):
+    """Every subset of the bits in mask, starting with the empty set"""
+    subset = 0
+    while True:
+        yield subset
+        subset = (subset - mask) & mask
+        if not subset:
+            break
+
+
+def find_magic(square, directions, rng=None):
+    """Search for a magic number that indexes square's attacks without collisions"""
+    rng = rng or random.Random()
+    mask = relevant_occupancy_mask(square, directions)
+    shift = 64 - mask.bit_count()
+    occupancies = list(occupancy_subsets(mask))
+    attacks = [ray_attacks(square, directions, occupied) for occupied in occupancies]
+    
+    while True:
+        # Sparse candidates work best
+        magic = rng.getrandbits(64) & rng.getrandbits(64) & rng.getrandbits(64)
+        if (((mask * magic) & MASK64) >> 56).bit_count() < 6:
+            continue
+        
+        table = {}
+        for occupied, attack in zip(occupancies, attacks):
+            index = ((occupied * magic) & MASK64) >> shift
+            if table.setdefault(index, attack) != attack:
+                break
+        else:
+            return magic
+
+
+def _build_tables(magics, directions):
+    """Fill the attack table of every square for the given magic numbers"""
+    masks, shifts, tables = [], [], []
+    for square, magic in enumerate(magics):
+        mask = relevant_occupancy_mask(square, directions)
+        shift = 64 - mask.bit_count()
+        table = [0] * (1 << (64 - shift))
+        for occupied in occupancy_subsets(mask):
+            table[((occupied * magic) & MASK64) >> shift] = ray_attacks(square, directions, occupied)
+        masks.append(mask)
+        shifts.append(shift)
+        tables.append(table)
+    return masks, shifts, tables
+
+
+ROOK_MASKS, ROOK_SHIFTS, ROOK_TABLES = _build_tables(ROOK_MAGICS, ROOK_DIRECTIONS)
+BISHOP_MASKS, BISHOP_SHIFTS, BISHOP_TABLES = _build_tables(BISHOP_MAGICS, BISHOP_DIRECTIONS)
+
+
+def rook_attacks(square, occupied):
+    """Rook attacks from square given the board occupancy"""
+    return ROOK_TABLES[square][((occupied & ROOK_MASKS[square]) * ROOK_MAGICS[square] & MASK64) >> ROOK_SHIFTS[square]]
+
+
+def bishop_attacks(square, occupied):
+    """Bishop attacks from square given the board occupancy"""
+    return BISHOP_TABLES[square][((occupied & BISHOP_MASKS[square]) * BISHOP_MAGICS[square] & MASK64) >> BISHOP_SHIFTS[square]]
+
+
+def queen_attacks(square, occupied):
+    """Queen attacks: the union of the rook and bishop lookups"""
+    return rook_attacks(square, occupied) | bishop_attacks(square, occupied)
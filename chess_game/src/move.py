@@ -2,13 +2,95 @@
 Move class for representing chess moves
 """
 
+from constants import QUEEN, ROOK, BISHOP, KNIGHT, Color, PieceType
+from pieces import PIECE_CLASSES
+
+# Promotion suffixes used in coordinate notation
+PROMOTION_LETTERS = {QUEEN: 'q', ROOK: 'r', BISHOP: 'b', KNIGHT: 'n'}
+
+# Packed moves are 16-bit ints: from square in bits 0-5, to square in bits
+# 6-11 and the promotion piece type in bits 12-14 (0 for none: pawns never
+# promote to pawns). Castling and en passant need no flag, push_move tells
+# them from the position, so a move played in the UI and the same generated
+# move are equal
+TO_SHIFT = 6
+PROMOTION_SHIFT = 12
+SQUARE_MASK = 0x3F
+
+
+def encode_move(from_sq, to_sq, promotion=None):
+    """Pack a move into a 16-bit int"""
+    return from_sq | to_sq << TO_SHIFT | (promotion or 0) << PROMOTION_SHIFT
+
+
+def move_from(move):
+    """From square of a packed move"""
+    return move & SQUARE_MASK
+
+
+def move_to(move):
+    """To square of a packed move"""
+    return move >> TO_SHIFT & SQUARE_MASK
+
+
+def move_promotion(move):
+    """Promotion piece type of a packed move, or None"""
+    promotion = move >> PROMOTION_SHIFT
+    return PieceType(promotion) if promotion else None
+
+
+def decode_move(move):
+    """Unpack a move into (from_sq, to_sq, promotion)"""
+    return move & SQUARE_MASK, move >> TO_SHIFT & SQUARE_MASK, move_promotion(move)
+
+
+def square_name(square):
+    """Name of a square index in algebraic notation, e.g. 52 -> 'e2'"""
+    row, col = divmod(square, 8)
+    return f"{chr(ord('a') + col)}{8 - row}"
+
+
+def move_to_uci(move):
+    """Coordinate notation of a packed move, e.g. 'e7e8q'"""
+    from_sq, to_sq, promotion = decode_move(move)
+    return square_name(from_sq) + square_name(to_sq) + PROMOTION_LETTERS.get(promotion, '')
+
+
 class Move:
-    def __init__(self, from_pos, to_pos, piece, captured_piece=None, special_move=None):
-        self.from_pos = from_pos
-        self.to_pos = to_pos
-        self.piece = piece
-        self.captured_piece = captured_piece
-        self.special_move = special_move  # For castling, en passant, etc.
+    """A played move: the packed move plus the mailbox codes of the moving and captured pieces"""
+    
+    __slots__ = ('move', 'piece_code', 'captured_code')
+    
+    def __init__(self, move, piece_code, captured_code=0):
+        self.move = move
+        self.piece_code = piece_code
+        self.captured_code = captured_code
+    
+    @property
+    def from_pos(self):
+        return divmod(self.move & SQUARE_MASK, 8)
+    
+    @property
+    def to_pos(self):
+        return divmod(self.move >> TO_SHIFT & SQUARE_MASK, 8)
+    
+    @property
+    def color(self):
+        return Color((self.piece_code - 1) // 6)
+    
+    @property
+    def piece_type(self):
+        return PieceType((self.piece_code - 1) % 6)
+    
+    @property
+    def piece(self):
+        """The moving piece, rebuilt on its from square"""
+        return _build_piece(self.piece_code, self.from_pos)
+    
+    @property
+    def captured_piece(self):
+        """The captured piece, if any (rebuilt on each access)"""
+        return _build_piece(self.captured_code, self.to_pos) if self.captured_code else None
     
     def __str__(self):
         return f"{self.piece} from {self.from_pos} to {self.to_pos}"
@@ -24,4 +106,10 @@ class Move:
         to_file = chr(ord('a') + self.to_pos[1])
         to_rank = str(8 - self.to_pos[0])
         
-        return f"{from_file}{from_rank}{to_file}{to_rank}"
\ No newline at end of file
+        return f"{from_file}{from_rank}{to_file}{to_rank}"
+
+
+def _build_piece(code, position):
+    """Piece object for a mailbox piece code"""
+    color_index, type_index = divmod(code - 1, 6)
+    return PIECE_CLASSES[type_index](Color(color_index), position)
@@ -0,0 +1,72 @@
+"""
+Legal move cache
+Bounded LRU cache of legal move arrays keyed by the Zobrist hash of the
+position. One cache is shared by the UI, the game loop and the AI, so
+positions seen again (re-selection, undo, transpositions) cost a lookup.
+Moves are stored as immutable bytes (the packed array('H') buffer), so
+no caller can change another board's moves.
+"""
+
+import threading
+from collections import OrderedDict
+from constants import MOVE_CACHE_CAPACITY
+
+
+class MoveCache:
+    """Least-recently-used map from position hash to the packed legal moves as bytes"""
+    
+    def __init__(self, capacity=MOVE_CACHE_CAPACITY):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()  # The AI searches on its own thread
+    
+    def get(self, key):
+        """Cached moves (bytes of a packed array('H')) for a position key, or None"""
+        with self._lock:
+            moves = self._entries.get(key)
+            if moves is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return moves
+    
+    def peek(self, key):
+        """Cached moves for a position key, or None, without counting the lookup or refreshing the entry"""
+        return self._entries.get(key)  # A single dict lookup, atomic without the lock
+    
+    def put(self, key, moves):
+        """Remember the moves of a position, dropping the least recently used one if full"""
+        if self.capacity <= 0:
+            return
+        moves = bytes(moves)  # An immutable copy of the array's buffer
+        with self._lock:
+            self._entries[key] = moves
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+    
+    def resize(self, capacity):
+        """Change the capacity, dropping the oldest entries that no longer fit"""
+        with self._lock:
+            self.capacity = capacity
+            while self._entries and len(self._entries) > max(capacity, 0):
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    @property
+    def hit_rate(self):
+        """Fraction of lookups answered from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    def __len__(self):
+        return len(self._entries)
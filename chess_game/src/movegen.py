@@ -0,0 +1,203 @@
+"""
+Legal move generation
+Works directly on Board bitboards: checkers and pinned pieces are found
+once per position so only legal moves are emitted, without trying moves
+on a copy of the board. Moves are packed 16-bit ints (see move.py), and
+move lists are array('H') buffers. Moves are yielded lazily, so callers
+that need only the first few can stop early.
+"""
+
+from array import array
+from constants import *
+from bitboard import *
+from attack_tables import *
+from magic import rook_attacks, bishop_attacks
+from move import TO_SHIFT, PROMOTION_SHIFT
+
+PROMOTION_TYPES = (QUEEN, ROOK, BISHOP, KNIGHT)
+PROMOTION_BITS = tuple(int(piece_type) << PROMOTION_SHIFT for piece_type in PROMOTION_TYPES)
+
+
+def attackers_to(board, square, by_color, occupied=None):
+    """Bitboard of by_color pieces attacking square, given an occupancy"""
+    if occupied is None:
+        occupied = board.occupied
+    bitboards = board.bitboards
+    color_index = COLOR_INDEX[by_color]
+    base = color_index * 6
+
+    # A pawn attacks square exactly when a pawn of the other color on square would attack it
+    attackers = PAWN_ATTACKS[color_index ^ 1][square] & bitboards[base + PAWN_INDEX]
+    attackers |= KNIGHT_ATTACKS[square] & bitboards[base + KNIGHT_INDEX]
+    attackers |= KING_ATTACKS[square] & bitboards[base + KING_INDEX]
+    queens = bitboards[base + QUEEN_INDEX]
+    attackers |= rook_attacks(square, occupied) & (bitboards[base + ROOK_INDEX] | queens)
+    attackers |= bishop_attacks(square, occupied) & (bitboards[base + BISHOP_INDEX] | queens)
+
+    # Pieces missing from the occupancy (e.g. captured en passant) don't attack
+    return attackers & occupied
+
+
+def attacks_from(index, square, occupied):
+    """Squares attacked by the piece with bitboard index index standing on square"""
+    type_index = index % 6
+    if type_index == PAWN_INDEX:
+        return PAWN_ATTACKS[index // 6][square]
+    if type_index == KNIGHT_INDEX:
+        return KNIGHT_ATTACKS[square]
+    if type_index == BISHOP_INDEX:
+        return bishop_attacks(square, occupied)
+    if type_index == ROOK_INDEX:
+        return rook_attacks(square, occupied)
+    if type_index == QUEEN_INDEX:
+        return bishop_attacks(square, occupied) | rook_attacks(square, occupied)
+    return KING_ATTACKS[square]
+
+
+def is_square_attacked(board, square, by_color, occupied=None):
+    """Check if any by_color piece attacks square"""
+    return attackers_to(board, square, by_color, occupied) != 0
+
+
+def _pawn_moves(from_sq, to_sq, promotion_row):
+    """Pawn moves to to_sq, expanded into the four promotions on the last row"""
+    move = from_sq | to_sq << TO_SHIFT
+    if to_sq >> 3 == promotion_row:
+        return [move | bits for bits in PROMOTION_BITS]
+    return (move,)
+
+
+def generate_legal_moves(board, color=None):
+    """Array of every legal move for color (default: the side to move)"""
+    # Via a list: array() copies a list in one go but grows item by item from a generator
+    return array('H', list(iter_legal_moves(board, color)))
+
+
+def iter_legal_moves(board, color=None, captures_first=False):
+    """Yield the legal moves for color (default: the side to move) one at a time
+
+    With captures_first, every capture (en passant included) is yielded
+    before any quiet move. Closing the generator early skips the rest of
+    the generation.
+    """
+    if color is None:
+        color = board.current_player
+    us = COLOR_INDEX[color]
+    them = us ^ 1
+    enemy = COLORS[them]
+    bitboards = board.bitboards
+    base = us * 6
+    enemy_base = them * 6
+    own = board.occupancy[us]
+    enemies = board.occupancy[them]
+    occupied = board.occupied
+    # The en passant square belongs to the side to move
+    en_passant = board.en_passant_square if color == board.current_player else None
+
+    king_sq = board.king_squares[us]
+    checkers = 0
+    pins = {}
+    target = FULL ^ own
+
+    if king_sq is not None:
+        checkers = attackers_to(board, king_sq, enemy, occupied)
+        without_king = occupied ^ (1 << king_sq)
+
+        # In single check, other pieces must capture the checker or block
+        if checkers and not checkers & (checkers - 1):
+            target &= checkers | BETWEEN[king_sq][lsb(checkers)]
+
+        # Pinned pieces may only move along the line to their pinner
+        queens = bitboards[enemy_base + QUEEN_INDEX]
+        snipers = rook_attacks(king_sq, enemies) & (bitboards[enemy_base + ROOK_INDEX] | queens)
+        snipers |= bishop_attacks(king_sq, enemies) & (bitboards[enemy_base + BISHOP_INDEX] | queens)
+        for sniper in iter_squares(snipers):
+            blockers = BETWEEN[king_sq][sniper] & occupied
+            if blockers & own and not blockers & (blockers - 1):
+                pins[lsb(blockers)] = LINE[king_sq][sniper]
+
+    # Each stage only emits moves landing on its mask of destination squares
+    if captures_first:
+        captures = enemies
+        if en_passant is not None:
+            captures |= 1 << en_passant
+        stages = (captures, FULL ^ captures)
+    else:
+        stages = (FULL,)
+
+    forward = -8 if us == WHITE_INDEX else 8
+    start_row = 6 if us == WHITE_INDEX else 1
+    promotion_row = 0 if us == WHITE_INDEX else 7
+
+    for stage in stages:
+        if king_sq is not None:
+            # King moves: the king itself must not block attacks on squares behind it
+            for to_sq in iter_squares(KING_ATTACKS[king_sq] & ~own & stage):
+                if not is_square_attacked(board, to_sq, enemy, without_king):
+                    yield king_sq | to_sq << TO_SHIFT
+
+            # In double check only the king can move
+            if checkers & (checkers - 1):
+                continue
+
+        stage_target = target & stage
+
+        # Pawns
+        for from_sq in iter_squares(bitboards[base + PAWN_INDEX]):
+            allowed = stage_target & pins.get(from_sq, FULL)
+
+            to_sq = from_sq + forward
+            if not occupied >> to_sq & 1:
+                if allowed >> to_sq & 1:
+                    yield from _pawn_moves(from_sq, to_sq, promotion_row)
+                if from_sq >> 3 == start_row:
+                    to_sq += forward
+                    if not occupied >> to_sq & 1 and allowed >> to_sq & 1:
+                        yield from_sq | to_sq << TO_SHIFT
+
+            attacks = PAWN_ATTACKS[us][from_sq]
+            for to_sq in iter_squares(attacks & enemies & allowed):
+                yield from _pawn_moves(from_sq, to_sq, promotion_row)
+
+            if en_passant is not None and (attacks & stage) >> en_passant & 1:
+                # Check the position after the capture directly: it can expose
+                # the king along the rank both pawns leave
+                captured_sq = en_passant - forward
+                after = occupied ^ (1 << from_sq) ^ (1 << en_passant) ^ (1 << captured_sq)
+                if king_sq is None or not is_square_attacked(board, king_sq, enemy, after):
+                    yield from_sq | en_passant << TO_SHIFT
+
+        # Knights (a pinned knight can never move)
+        for from_sq in iter_squares(bitboards[base + KNIGHT_INDEX]):
+            if from_sq not in pins:
+                for to_sq in iter_squares(KNIGHT_ATTACKS[from_sq] & stage_target):
+                    yield from_sq | to_sq << TO_SHIFT
+
+        # Sliders (queens use both the bishop and rook lookups)
+        queens = bitboards[base + QUEEN_INDEX]
+        for pieces, slider_attacks in ((bitboards[base + BISHOP_INDEX] | queens, bishop_attacks),
+                                       (bitboards[base + ROOK_INDEX] | queens, rook_attacks)):
+            for from_sq in iter_squares(pieces):
+                allowed = stage_target & pins.get(from_sq, FULL)
+                for to_sq in iter_squares(slider_attacks(from_sq, occupied) & allowed):
+                    yield from_sq | to_sq << TO_SHIFT
+
+        # Castling: not out of, through or into check
+        if king_sq is not None and not checkers:
+            if us == WHITE_INDEX:
+                home, kingside, queenside = 60, WHITE_KINGSIDE, WHITE_QUEENSIDE
+            else:
+                home, kingside, queenside = 4, BLACK_KINGSIDE, BLACK_QUEENSIDE
+            rights = board.castling_rights
+            rooks = bitboards[base + ROOK_INDEX]
+            if king_sq == home and rights & (kingside | queenside):
+                attacked = board.attacked_squares(enemy)
+                # Castling lands on an empty square, so it belongs to the quiet stage
+                if (rights & kingside and stage >> (home + 2) & 1 and rooks >> (home + 3) & 1
+                        and not occupied & (0b11 << (home + 1))
+                        and not attacked & (0b11 << (home + 1))):
+                    yield home | (home + 2) << TO_SHIFT
+                if (rights & queenside and stage >> (home - 2) & 1 and rooks >> (home - 4) & 1
+                        and not occupied & (0b111 << (home - 3))
+                        and not attacked & (0b11 << (home - 2))):
+                    yield home | (home - 2) << TO_SHIFT
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Perft - move generation counter and benchmark
+Counts the leaf nodes of the legal move tree to a fixed depth. The
+totals for well-known positions are published, so perft doubles as a
+correctness check for move generation and as a throughput benchmark.
+
+Usage:
+    python perft.py 4
+    python perft.py 3 --fen "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1" --divide
+    python perft.py 5 --hash 64 --processes 4
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from board import Board
+import movegen
+from constants import STARTING_FEN
+from move import move_to_uci
+
+
+class PerftTable:
+    """Fixed-size, always-replace cache of subtree node counts"""
+    
+    ENTRY_BYTES = 64  # Rough cost of one slot (tuple of three ints)
+    
+    def __init__(self, size_mb):
+        self.size = max(1, int(size_mb * 1024 * 1024) // self.ENTRY_BYTES)
+        self.slots = [None] * self.size
+        self.hits = 0
+        self.probes = 0
+    
+    def get(self, key, depth):
+        """Cached node count for a position and depth, or None"""
+        self.probes += 1
+        entry = self.slots[key % self.size]
+        if entry is not None and entry[0] == key and entry[1] == depth:
+            self.hits += 1
+            return entry[2]
+        return None
+    
+    def put(self, key, depth, nodes):
+        """Remember the node count of a position at a depth"""
+        self.slots[key % self.size] = (key, depth, nodes)
+
+
+def perft(board, depth, table=None):
+    """Count leaf nodes of the legal move tree below board to the given depth"""
+    if depth == 0:
+        return 1
+    
+    # Straight from the generator: perft measures generation, not the move cache
+    moves = movegen.generate_legal_moves(board)
+    # Bulk counting: the last ply needs no make/unmake
+    if depth == 1:
+        return len(moves)
+    
+    if table is not None:
+        nodes = table.get(board.hash_key, depth)
+        if nodes is not None:
+            return nodes
+    
+    nodes = 0
+    for move in moves:
+        board.push_move(move)
+        nodes += perft(board, depth - 1, table)
+        board.pop_move()
+    
+    if table is not None:
+        table.put(board.hash_key, depth, nodes)
+    return nodes
+
+
+# Hash table of a worker process, shared by every root move it counts
+_worker_table = None
+
+
+def _init_worker(hash_mb):
+    """Worker initializer: allocate the process's hash table once"""
+    global _worker_table
+    _worker_table = PerftTable(hash_mb) if hash_mb else None
+
+
+def _perft_root_move(args):
+    """Worker: count the subtree below one root move"""
+    fen, move, depth = args
+    board = Board.from_fen(fen)
+    board.push_move(move)
+    return perft(board, depth - 1, _worker_table)
+
+
+def divide(fen, depth, hash_mb=0, processes=1):
+    """Node counts below each root move, as a list of (move, nodes)
+    
+    At depth 0 there are no root moves to split over, so the list is
+    empty; the total is then the root alone (see perft).
+    """
+    if depth < 0:
+        raise ValueError(f"Perft depth must not be negative: {depth}")
+    if depth == 0:
+        return []
+    board = Board.from_fen(fen)
+    moves = board.generate_legal_moves()
+    if depth == 1:
+        return [(move, 1) for move in moves]
+    
+    jobs = [(fen, move, depth) for move in moves]
+    if processes > 1:
+        # Each worker gets its own board per root move, and one hash table
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(hash_mb,)) as executor:
+            counts = list(executor.map(_perft_root_move, jobs))
+    else:
+        table = PerftTable(hash_mb) if hash_mb else None
+        counts = []
+        for move in moves:
+            board.push_move(move)
+            counts.append(perft(board, depth - 1, table))
+            board.pop_move()
+    
+    return list(zip(moves, counts))
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Count legal move tree leaf nodes (perft)")
+    parser.add_argument('depth', type=int, help="search depth in plies")
+    parser.add_argument('--fen', default=STARTING_FEN, help="position to start from (default: start position)")
+    parser.add_argument('--divide', action='store_true', help="print the node count below each root move")
+    parser.add_argument('--hash', type=float, default=0, metavar='MB', help="size of the perft hash table per process")
+    parser.add_argument('--processes', type=int, default=1, help="split root moves across this many processes")
+    args = parser.parse_args(argv)
+    if args.depth < 0:
+        parser.error("depth must not be negative")
+    
+    start = time.perf_counter()
+    results = divide(args.fen, args.depth, args.hash, args.processes)
+    elapsed = time.perf_counter() - start
+    nodes = sum(count for move, count in results) if args.depth else 1
+    
+    if args.divide:
+        for move, count in sorted(results, key=lambda result: move_to_uci(result[0])):
+            print(f"{move_to_uci(move)}: {count}")
+        print()
+    print(f"Depth: {args.depth}")
+    print(f"Nodes: {nodes}")
+    print(f"Time: {elapsed:.3f}s")
+    print(f"NPS: {nodes / elapsed if elapsed > 0 else 0:.0f}")
+    return nodes
+
+
+if __name__ == "__main__":
+    main()
@@ -13,4 +13,7 @@ from bishop import Bishop
 from queen import Queen
 from king import King
 
-__all__ = ['Piece', 'Pawn', 'Rook', 'Knight', 'Bishop', 'Queen', 'King']
\ No newline at end of file
+# Piece classes by type index, for building Piece objects from mailbox codes
+PIECE_CLASSES = (Pawn, Knight, Bishop, Rook, Queen, King)
+
+__all__ = ['Piece', 'Pawn', 'Rook', 'Knight', 'Bishop', 'Queen', 'King', 'PIECE_CLASSES']
\ No newline at end of file
@@ -3,13 +3,12 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from constants import *
+from bitboard import COLOR_INDEX, iter_squares
+from attack_tables import PAWN_ATTACKS
 
 class Pawn(Piece):
-    def __init__(self, color, position):
-        super().__init__(color, position)
-    
-    def get_piece_type(self):
-        return PAWN
+    __slots__ = ()
+    piece_type = PAWN
     
     def get_valid_moves(self, board):
         moves = []
@@ -29,13 +28,11 @@ class Pawn(Piece):
                 if 0 <= new_row < 8 and board.get_piece_at(new_row, col) is None:
                     moves.append((new_row, col))
         
-        # Diagonal captures
-        for dc in [-1, 1]:
-            new_row = row + direction
-            new_col = col + dc
-            if 0 <= new_row < 8 and 0 <= new_col < 8:
-                target_piece = board.get_piece_at(new_row, new_col)
-                if target_piece and target_piece.color != self.color:
-                    moves.append((new_row, new_col))
+        # Diagonal captures, including en passant of a pawn that just moved two squares
+        color_index = COLOR_INDEX[self.color]
+        targets = PAWN_ATTACKS[color_index][row * 8 + col] & board.occupancy[color_index ^ 1]
+        if board.en_passant_square is not None and self.color == board.current_player:
+            targets |= PAWN_ATTACKS[color_index][row * 8 + col] & (1 << board.en_passant_square)
+        moves.extend(divmod(square, 8) for square in iter_squares(targets))
         
         return moves
\ No newline at end of file
@@ -1,22 +1,27 @@
 from abc import ABC, abstractmethod
-import pygame
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from constants import WHITE_PIECE, BLACK_PIECE
 
 class Piece(ABC):
+    # Per-square state only; behavior and the piece type are shared by the class
+    __slots__ = ('color', 'position', 'has_moved')
+    piece_type = None
+    
     def __init__(self, color, position):
         self.color = color
         self.position = position
         self.has_moved = False
-        self.image = None
     
     @abstractmethod
     def get_valid_moves(self, board):
         """Return list of valid moves for this piece"""
         pass
     
-    @abstractmethod
     def get_piece_type(self):
-        """Return the piece type as string"""
-        pass
+        """Return the piece type (a PieceType)"""
+        return self.piece_type
     
     def move_to(self, new_position):
         """Move piece to new position"""
@@ -24,10 +29,10 @@ class Piece(ABC):
         self.has_moved = True
     
     def is_white(self):
-        return self.color == 'white'
+        return self.color == WHITE_PIECE
     
     def is_black(self):
-        return self.color == 'black'
+        return self.color == BLACK_PIECE
     
     def copy(self):
         """Create a copy of this piece"""
@@ -35,5 +40,15 @@ class Piece(ABC):
         piece_copy.has_moved = self.has_moved
         return piece_copy
     
+    def __eq__(self, other):
+        """Pieces are values: Board builds a fresh object on every lookup"""
+        if not isinstance(other, Piece):
+            return NotImplemented
+        return (type(self), self.color, self.position, self.has_moved) == \
+            (type(other), other.color, other.position, other.has_moved)
+    
+    def __hash__(self):
+        return hash((type(self), self.color, self.position))
+    
     def __str__(self):
         return f"{self.color} {self.get_piece_type()} at {self.position}"
\ No newline at end of file
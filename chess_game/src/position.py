@@ -0,0 +1,61 @@
+"""
+Immutable position snapshots
+A Position is a plain value taken from a Board: it can be handed to other
+threads or processes and read there without locks, while the Board stays
+the mutable object the UI works on. Search turns it back into a private
+Board with Board.from_position.
+"""
+
+from collections import namedtuple
+
+_PositionFields = namedtuple('Position', [
+    'squares',            # bytes: mailbox piece code per square
+    'bitboards',          # tuple of the 12 piece bitboards
+    'piece_attacks',      # tuple: attack map of the piece on each square
+    'current_player',
+    'castling_rights',
+    'en_passant_square',
+    'halfmove_clock',
+    'fullmove_number',
+    'unmoved',            # bitboard of pieces that have not moved yet
+    'hash_key',
+    'history',            # tuple of hash keys since the last capture or pawn move
+])
+
+
+class Position(_PositionFields):
+    """Read-only snapshot of a board position (see Board.position)"""
+    
+    __slots__ = ()
+    
+    def __hash__(self):
+        return self.hash_key
+    
+    def __eq__(self, other):
+        """Positions are equal when their Zobrist keys are, like boards"""
+        if not isinstance(other, Position):
+            return NotImplemented
+        return self.hash_key == other.hash_key
+    
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+    
+    def to_board(self):
+        """New mutable Board holding this position"""
+        from board import Board
+        return Board.from_position(self)
+    
+    def legal_moves(self):
+        """Array of packed legal moves for the side to move"""
+        return self.to_board().generate_legal_moves()
+    
+    def push(self, move):
+        """Position after making a packed move"""
+        board = self.to_board()
+        board.push_move(move)
+        return board.position()
+    
+    def to_fen(self):
+        """Describe the position as a FEN string"""
+        return self.to_board().to_fen()
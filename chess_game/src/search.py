@@ -0,0 +1,332 @@
+"""
+Alpha-beta search for the AI player
+Negamax with alpha-beta pruning over the board's make/unmake moves. Scores
+are in centipawns from the side to move's point of view. Moves are tried
+in order of promise: the transposition table move, captures by MVV-LVA,
+the killer moves of the ply, then quiet moves by their history score, so
+most cutoffs come from the first move searched.
+Iterative deepening searches one ply deeper at a time until a time or node
+budget runs out, always keeping the best move of the last full iteration.
+An optional transposition table lets positions reached by different move
+orders, or in earlier searches, reuse their results.
+"""
+
+import time
+from constants import *
+from bitboard import *
+from move import TO_SHIFT, PROMOTION_SHIFT, SQUARE_MASK
+from transposition import EXACT, LOWER_BOUND, UPPER_BOUND
+
+# Material in centipawns by bitboard index (the king is never captured)
+INDEX_VALUES = [PIECE_VALUES[PIECE_TYPES[index % 6]] * 100 if index % 6 != KING_INDEX else 0
+                for index in range(12)]
+
+# Positional terms, as used by the original AI: pieces on and attacks
+# of the center squares, and pieces moved off the back row
+CENTER_PIECE_BONUS = 15
+CENTER_ATTACK_BONUS = 5
+DEVELOPMENT_BONUS = 10
+BACK_ROWS = (ROW_MASKS[7], ROW_MASKS[0])  # Indexed by WHITE_INDEX / BLACK_INDEX
+
+# Scores beyond MATE_BOUND are mates; nearer mates score higher
+MATE_SCORE = 100000
+MATE_BOUND = MATE_SCORE - 1000
+INFINITY = MATE_SCORE + 1
+
+# Deepest iteration tried, and nodes searched between budget checks (at
+# tens of microseconds a node, the clock is read every few milliseconds)
+MAX_DEPTH = 64
+CHECK_INTERVAL = 128
+
+# Move ordering bands: the table move, then captures and promotions, then
+# killers, then quiet moves by history (kept below the killer band)
+HASH_MOVE_ORDER = 1 << 30
+CAPTURE_ORDER = 1 << 28
+KILLER_ORDER = 1 << 26
+HISTORY_LIMIT = KILLER_ORDER - 2
+KILLERS_PER_PLY = 2
+
+# MVV-LVA: the victim's value counts first, the attacker's breaks ties
+# (a victim step of 256 outweighs any attacker, the king included)
+VICTIM_SCALE = 256
+CODE_VALUES = [0] + [PIECE_VALUES[PIECE_TYPES[index % 6]] for index in range(12)]  # By piece code
+PAWN_CODES = (WHITE_INDEX * 6 + PAWN_INDEX + 1, BLACK_INDEX * 6 + PAWN_INDEX + 1)
+PAWN_VALUE = PIECE_VALUES[PAWN]
+
+
+def evaluate(board):
+    """Static score of the position for the side to move"""
+    us = COLOR_INDEX[board.current_player]
+    them = us ^ 1
+    bitboards = board.bitboards
+    score = 0
+    for index in range(us * 6, us * 6 + 6):
+        score += INDEX_VALUES[index] * bitboards[index].bit_count()
+    for index in range(them * 6, them * 6 + 6):
+        score -= INDEX_VALUES[index] * bitboards[index].bit_count()
+
+    own = board.occupancy[us]
+    theirs = board.occupancy[them]
+    score += CENTER_PIECE_BONUS * ((own & CENTER_MASK).bit_count() - (theirs & CENTER_MASK).bit_count())
+    score += CENTER_ATTACK_BONUS * ((board.attacked_squares(COLORS[us]) & CENTER_MASK).bit_count()
+                                    - (board.attacked_squares(COLORS[them]) & CENTER_MASK).bit_count())
+    moved = ~board.unmoved
+    score += DEVELOPMENT_BONUS * ((own & BACK_ROWS[us] & moved).bit_count()
+                                  - (theirs & BACK_ROWS[them] & moved).bit_count())
+    return score
+
+
+def score_to_table(score, ply):
+    """Make a mate score relative to the node, so it can be stored and found at any ply"""
+    if score > MATE_BOUND:
+        return score + ply
+    if score < -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_table(score, ply):
+    """Turn a stored mate score back into one relative to the root"""
+    if score > MATE_BOUND:
+        return score - ply
+    if score < -MATE_BOUND:
+        return score + ply
+    return score
+
+
+def is_capture(board, move):
+    """Whether a move takes a piece, en passant included"""
+    to_sq = move >> TO_SHIFT & SQUARE_MASK
+    return bool(board.squares[to_sq]) or (to_sq == board.en_passant_square
+                                          and board.squares[move & SQUARE_MASK] in PAWN_CODES)
+
+
+class SearchStopped(Exception):
+    """Raised inside the search when its budget runs out or stop() was called"""
+
+
+class Search:
+    """Negamax alpha-beta search, fixed-depth or iterative deepening within a budget"""
+    
+    def __init__(self, table=None):
+        self.table = table  # TranspositionTable shared between searches, or None
+        self.nodes = 0
+        self.depth = 0  # Depth of the last completed iteration
+        self.stopped = False
+        self.deadline = None  # perf_counter() time to stop at
+        self.node_limit = None
+        self.next_check = CHECK_INTERVAL
+        self.killers = [[0] * KILLERS_PER_PLY for _ in range(MAX_DEPTH + 1)]
+        self.history = [0] * 4096  # By from square | to square << 6
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+    
+    def stop(self):
+        """Ask a search (e.g. on another thread) to stop at its next budget check
+        
+        A stop that arrives before the search starts is kept, so the search
+        stops at its first node; iterate() clears the flag when it returns.
+        """
+        self.stopped = True
+    
+    def _start(self, time_limit=None, node_limit=None):
+        """Reset counters and set the budget for a new search"""
+        self.nodes = 0
+        self.depth = 0
+        self.deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        self.node_limit = node_limit
+        self.next_check = min(CHECK_INTERVAL, node_limit) if node_limit is not None else CHECK_INTERVAL
+        if self.stopped:
+            self.next_check = 0  # Stopped before it started: check the budget at once
+        for killers in self.killers:
+            killers[:] = [0] * KILLERS_PER_PLY
+        self.history = [0] * 4096
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        if self.table is not None:
+            self.table.new_search()
+    
+    @property
+    def first_move_cutoff_rate(self):
+        """Fraction of beta cutoffs made by the first move searched"""
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+    
+    def _check_budget(self):
+        """Raise SearchStopped once the budget is spent; called every CHECK_INTERVAL nodes"""
+        if self.stopped:
+            raise SearchStopped
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchStopped
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchStopped
+        self.next_check = self.nodes + CHECK_INTERVAL
+        if self.node_limit is not None:
+            self.next_check = min(self.next_check, self.node_limit)
+    
+    def search(self, board, depth):
+        """Best move and its score for the side to move, searching exactly depth plies"""
+        self._start()
+        return self._search_root(board, depth, self.order_moves(board, board.generate_legal_moves()))
+    
+    def iterate(self, board, max_depth=MAX_DEPTH, time_limit=None, node_limit=None):
+        """Best move and score of the deepest iteration completed within the time (seconds) or node budget"""
+        self._start(time_limit, node_limit)
+        moves = self.order_moves(board, board.generate_legal_moves())
+        if not moves:
+            self.stopped = False
+            return None, self._terminal_score(board, 0)
+        
+        # Until an iteration completes, fall back to the first move
+        best_move, best_score = moves[0], 0
+        for depth in range(1, max_depth + 1):
+            try:
+                move, score = self._search_root(board, depth, moves)
+            except SearchStopped:
+                break
+            best_move, best_score = move, score
+            self.depth = depth
+            
+            # Search the best move first in the next iteration: it is most
+            # likely to stay best, and makes the other moves cut off sooner
+            moves.remove(move)
+            moves.insert(0, move)
+            
+            # A forced mate (or a single legal move) won't change with more depth
+            if abs(score) > MATE_BOUND or len(moves) == 1:
+                break
+        self.stopped = False
+        return best_move, best_score
+    
+    def _search_root(self, board, depth, moves):
+        """Best of the given root moves and its score, searching depth plies"""
+        if not moves:
+            return None, self._terminal_score(board, 0)
+        best_move = None
+        alpha = -INFINITY
+        for move in moves:
+            board.push_move(move)
+            try:
+                score = -self.negamax(board, depth - 1, -INFINITY, -alpha, 1)
+            finally:
+                board.pop_move()
+            if score > alpha:
+                alpha = score
+                best_move = move
+        return best_move, alpha
+    
+    def order_moves(self, board, moves, table_move=0, ply=0):
+        """The moves as a list, most promising first"""
+        squares = board.squares
+        en_passant = board.en_passant_square
+        killers = self.killers[ply]
+        history = self.history
+        keyed = []
+        for move in moves:
+            if move == table_move:
+                keyed.append((HASH_MOVE_ORDER, move))
+                continue
+            to_sq = move >> TO_SHIFT & SQUARE_MASK
+            attacker = squares[move & SQUARE_MASK]
+            victim = CODE_VALUES[squares[to_sq]]
+            if to_sq == en_passant and attacker in PAWN_CODES:
+                victim = PAWN_VALUE
+            promotion = move >> PROMOTION_SHIFT
+            if promotion:
+                victim += PIECE_VALUES[PIECE_TYPES[promotion]]  # The pawn turns into the new piece
+            if victim:
+                keyed.append((CAPTURE_ORDER + victim * VICTIM_SCALE - CODE_VALUES[attacker], move))
+            elif move in killers:
+                keyed.append((KILLER_ORDER + (move == killers[0]), move))
+            else:
+                keyed.append((history[move & 0xFFF], move))
+        keyed.sort(reverse=True)
+        return [move for _, move in keyed]
+    
+    def _record_cutoff(self, board, move, depth, ply, index):
+        """Count a beta cutoff, and remember a quiet cutoff move as a killer and in the history"""
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        if move >> PROMOTION_SHIFT or is_capture(board, move):
+            return  # Captures are already ordered first
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        history = self.history
+        key = move & 0xFFF
+        history[key] += depth * depth
+        if history[key] > HISTORY_LIMIT:
+            # Halve every score, keeping their order but staying below the killers
+            self.history = [score >> 1 for score in history]
+    
+    def _terminal_score(self, board, ply):
+        """Score of a position without legal moves: checkmate or stalemate"""
+        return -MATE_SCORE + ply if board.is_in_check(board.current_player) else 0
+    
+    def negamax(self, board, depth, alpha, beta, ply):
+        """Score of the position for the side to move, exact within (alpha, beta)"""
+        self.nodes += 1
+        if self.nodes >= self.next_check:
+            self._check_budget()
+        
+        # A repeated position or the fifty-move rule is a draw
+        if board.is_repetition() or board.is_fifty_move_draw():
+            return 0
+        if depth <= 0:
+            # Still make sure a leaf isn't checkmate or stalemate
+            if not board.has_legal_moves():
+                return self._terminal_score(board, ply)
+            return evaluate(board)
+        
+        # A stored result at least as deep may settle the node outright;
+        # otherwise its best move is tried first
+        table = self.table
+        table_move = 0
+        if table is not None:
+            entry = table.probe(board.hash_key)
+            if entry is not None:
+                entry_depth, bound, score, table_move = entry
+                if entry_depth >= depth:
+                    score = score_from_table(score, ply)
+                    if (bound == EXACT or (bound == LOWER_BOUND and score >= beta)
+                            or (bound == UPPER_BOUND and score <= alpha)):
+                        return score
+        
+        # Every move is ordered, so the full list comes through the shared
+        # move cache: interior nodes revisited by the next iteration find it
+        # there. The stored move is only ordered first if it is in the list,
+        # as colliding keys can store another position's move
+        moves = self.order_moves(board, board.generate_legal_moves(), table_move, ply)
+        
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = 0
+        for index, move in enumerate(moves):
+            board.push_move(move)
+            try:
+                score = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                board.pop_move()
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score >= beta:
+                # Cutoff: the opponent won't allow this line
+                self._record_cutoff(board, move, depth, ply, index)
+                break
+            if score > alpha:
+                alpha = score
+        
+        if best_score == -INFINITY:
+            return self._terminal_score(board, ply)  # No legal moves
+        
+        if table is not None:
+            if best_score >= beta:
+                bound = LOWER_BOUND
+            elif best_score <= original_alpha:
+                bound = UPPER_BOUND
+            else:
+                bound = EXACT
+            table.store(board.hash_key, depth, bound, score_to_table(best_score, ply), best_move)
+        return best_score
@@ -0,0 +1,100 @@
+"""
+Transposition table for the search
+Remembers search results by Zobrist key in two preallocated array('Q')
+buffers, so memory use is fixed up front. Each bucket has two slots: a
+depth-preferred slot that keeps the deepest result of the current search,
+and an always-replace slot for everything else. Entries are packed into
+one 64-bit word, and the stored key is XORed with it so an entry torn by
+a concurrent write no longer matches its key.
+"""
+
+from array import array
+from constants import TRANSPOSITION_TABLE_MB
+
+# Bound types: how the stored score relates to the true score
+EXACT = 1
+LOWER_BOUND = 2  # The search failed high: true score >= score
+UPPER_BOUND = 3  # The search failed low: true score <= score
+
+SLOT_BYTES = 16  # 8 for the key, 8 for the packed entry
+KEY_MASK = (1 << 64) - 1
+
+# Packed entry: move in bits 0-15, depth 16-23, bound 24-25, generation
+# 26-31 and the score (offset to be unsigned) in bits 32-63
+DEPTH_SHIFT = 16
+BOUND_SHIFT = 24
+GENERATION_SHIFT = 26
+SCORE_SHIFT = 32
+SCORE_OFFSET = 1 << 31
+GENERATIONS = 64
+
+
+class TranspositionTable:
+    """Fixed-size table of search results with two-tier buckets"""
+    
+    def __init__(self, size_mb=TRANSPOSITION_TABLE_MB):
+        self.resize(size_mb)
+    
+    def resize(self, size_mb):
+        """Reallocate the table to use about size_mb megabytes, dropping all entries"""
+        self.size_mb = size_mb
+        self.buckets = max(1, int(size_mb * 1024 * 1024) // (2 * SLOT_BYTES))
+        slots = 2 * self.buckets
+        self.keys = array('Q', bytes(8 * slots))
+        self.entries = array('Q', bytes(8 * slots))
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+    
+    def clear(self):
+        """Drop every entry and reset the statistics"""
+        self.resize(self.size_mb)
+    
+    def new_search(self):
+        """Start a new search: entries from older searches may be replaced first"""
+        self.generation = (self.generation + 1) % GENERATIONS
+    
+    def probe(self, key):
+        """Stored (depth, bound, score, move) for a position key, or None"""
+        self.probes += 1
+        key &= KEY_MASK
+        slot = key % self.buckets * 2
+        for index in (slot, slot + 1):
+            entry = self.entries[index]
+            if entry and self.keys[index] ^ entry == key:
+                self.hits += 1
+                return (entry >> DEPTH_SHIFT & 0xFF, entry >> BOUND_SHIFT & 3,
+                        (entry >> SCORE_SHIFT) - SCORE_OFFSET, entry & 0xFFFF)
+        return None
+    
+    def store(self, key, depth, bound, score, move=0):
+        """Remember a search result for a position key"""
+        key &= KEY_MASK
+        slot = key % self.buckets * 2
+        entry = (move | depth << DEPTH_SHIFT | bound << BOUND_SHIFT | self.generation << GENERATION_SHIFT
+                 | (score + SCORE_OFFSET) << SCORE_SHIFT)
+        
+        # The depth-preferred slot takes the entry if it is as deep, holds the
+        # same position or was written by an earlier search; otherwise it
+        # goes to the always-replace slot
+        old = self.entries[slot]
+        if (not old or depth >= (old >> DEPTH_SHIFT & 0xFF) or self.keys[slot] ^ old == key
+                or (old >> GENERATION_SHIFT & (GENERATIONS - 1)) != self.generation):
+            index = slot
+        else:
+            index = slot + 1
+        self.keys[index] = key ^ entry
+        self.entries[index] = entry
+    
+    @property
+    def hit_rate(self):
+        """Fraction of probes that found their position"""
+        return self.hits / self.probes if self.probes else 0.0
+    
+    @property
+    def fill_ratio(self):
+        """Fraction of slots in use"""
+        return 1 - self.entries.count(0) / len(self.entries)
+    
+    def __len__(self):
+        return len(self.entries) - self.entries.count(0)
@@ -457,8 +457,8 @@ class Renderer:
         
         # Player color indicator (static, no animation)
         indicator_x = panel_x + PANEL_PADDING + player_surface.get_width() + 10
-        indicator_color = WHITE if board.current_player == 'white' else BLACK
-        border_color = BLACK if board.current_player == 'white' else WHITE
+        indicator_color = WHITE if board.current_player == WHITE_PIECE else BLACK
+        border_color = BLACK if board.current_player == WHITE_PIECE else WHITE
         
         # Simple indicator circle
         indicator_size = 12
@@ -0,0 +1,21 @@
+"""
+Zobrist hashing keys
+Random 64-bit keys that Board XORs together to identify a position.
+"""
+
+import random
+
+# Fixed seed so keys (and therefore hashes) are stable between runs
+_rng = random.Random(0x5A0B1257)
+
+# One key per (piece bitboard index, square)
+PIECE_KEYS = [[_rng.getrandbits(64) for _ in range(64)] for _ in range(12)]
+
+# XORed in when black is to move
+SIDE_KEY = _rng.getrandbits(64)
+
+# One key per combination of the four castling right bits (none -> 0)
+CASTLING_KEYS = [0] + [_rng.getrandbits(64) for _ in range(15)]
+
+# One key per en passant file
+EN_PASSANT_KEYS = [_rng.getrandbits(64) for _ in range(8)]
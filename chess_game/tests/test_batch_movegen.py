@@ -0,0 +1,72 @@
+import unittest
+import random
+import sys
+import os
+
+# Add src to path for testing
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from board import Board
+from move import decode_move
+from constants import STARTING_FEN
+
+if numpy is not None:
+    import batch_movegen
+
+# Perft test positions (castling, en passant, promotions, pins) and their move counts
+POSITIONS = [
+    (STARTING_FEN, 20),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", 48),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", 14),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", 6),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", 44),
+]
+
+
+def _random_boards(count, seed=5):
+    """Boards reached by short random playouts from the perft positions"""
+    rng = random.Random(seed)
+    boards = []
+    for index in range(count):
+        board = Board.from_fen(POSITIONS[index % len(POSITIONS)][0])
+        for _ in range(rng.randrange(16)):
+            moves = board.generate_legal_moves()
+            if not moves:
+                break
+            board.push_move(rng.choice(moves))
+        boards.append(board)
+    return boards
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestBatchMovegen(unittest.TestCase):
+    def test_matches_board_move_generation(self):
+        """Test batched moves match Board.generate_legal_moves position by position"""
+        boards = _random_boards(300)
+        moves = batch_movegen.generate_legal_moves_batch(*batch_movegen.encode_positions(boards), chunk_size=64)
+        for index, board in enumerate(boards):
+            expected = sorted((from_sq, to_sq, -1 if promotion is None else int(promotion))
+                              for from_sq, to_sq, promotion in map(decode_move, board.generate_legal_moves()))
+            selected = moves.position == index
+            found = sorted(zip(moves.from_square[selected].tolist(), moves.to_square[selected].tolist(),
+                               moves.promotion[selected].tolist()))
+            self.assertEqual(found, expected, board.to_fen())
+    
+    def test_counts_and_attack_sets(self):
+        """Test per-position move counts and attacked squares"""
+        boards = [Board.from_fen(fen) for fen, count in POSITIONS]
+        arrays = batch_movegen.encode_positions(boards)
+        counts = batch_movegen.count_legal_moves(*arrays)
+        self.assertEqual(counts.tolist(), [count for fen, count in POSITIONS])
+        
+        attacks = batch_movegen.attack_sets(arrays[0], arrays[1])
+        self.assertEqual([int(bb) for bb in attacks],
+                         [board.attacked_squares(board.current_player) for board in boards])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,6 @@
 import unittest
+import copy
+import random
 import sys
 import os
 
@@ -6,8 +8,12 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from board import Board
-from pieces import Pawn, Rook, King
-from constants import WHITE_PIECE, BLACK_PIECE
+from move_cache import MoveCache
+from move import encode_move, move_from, move_to
+from bitboard import square_position
+from pieces import Pawn, Rook, Knight, King
+from constants import WHITE_PIECE, BLACK_PIECE, KING, KNIGHT, BLACK_KINGSIDE, BLACK_QUEENSIDE, STARTING_FEN, \
+    IN_PROGRESS, CHECK, CHECKMATE, THREEFOLD_REPETITION, FIFTY_MOVE_RULE, GAME_OVER_STATUSES, SNAPSHOT_INTERVAL
 
 class TestBoard(unittest.TestCase):
     def setUp(self):
@@ -19,6 +25,14 @@ class TestBoard(unittest.TestCase):
         self.assertEqual(self.board.current_player, WHITE_PIECE)
         self.assertIsNone(self.board.selected_piece)
         self.assertEqual(len(self.board.valid_moves), 0)
+        
+        # The 8x8 grid is still available as a read-only view
+        grid = self.board.board
+        self.assertEqual(sum(1 for row in grid for piece in row if piece), 32)
+        self.assertIsInstance(grid[6][4], Pawn)
+        self.assertIsNone(grid[4][4])
+        with self.assertRaises(AttributeError):
+            self.board.board = grid
     
     def test_initial_piece_placement(self):
         """Test that pieces are placed correctly at start"""
@@ -63,6 +77,342 @@ class TestBoard(unittest.TestCase):
         
         # Player should switch
         self.assertEqual(self.board.current_player, BLACK_PIECE)
+    
+    def test_bitboards_track_pieces(self):
+        """Test that bitboards stay in sync with the piece grid"""
+        self.assertEqual(bin(self.board.occupied).count('1'), 32)
+        self.assertEqual(self.board.get_bitboard(WHITE_PIECE, KING), 1 << 60)
+        
+        self.board.move_piece((6, 4), (4, 4))
+        self.board.set_piece_at(0, 0, None)
+        
+        for row in range(8):
+            for col in range(8):
+                piece = self.board.get_piece_at(row, col)
+                bit = 1 << (row * 8 + col)
+                self.assertEqual(bool(self.board.occupied & bit), piece is not None)
+                if piece:
+                    self.assertTrue(self.board.get_bitboard(piece.color, piece.get_piece_type()) & bit)
+                    self.assertTrue(self.board.get_occupancy(piece.color) & bit)
+    
+    def test_mailbox_matches_bitboards(self):
+        """Test that the byte mailbox mirrors the bitboards through moves and undo"""
+        self.assertEqual(len(self.board.squares), 64)
+        self.board.move_piece((6, 4), (4, 4))
+        self.board.move_piece((1, 3), (3, 3))
+        self.board.move_piece((4, 4), (3, 3))
+        
+        for square, code in enumerate(self.board.squares):
+            for index, bb in enumerate(self.board.bitboards):
+                self.assertEqual(bool(bb >> square & 1), code == index + 1)
+        
+        # Pieces are built from the mailbox on demand, with has_moved derived
+        pawn = self.board.get_piece_at(3, 3)
+        self.assertIsInstance(pawn, Pawn)
+        self.assertEqual(pawn.color, WHITE_PIECE)
+        self.assertTrue(pawn.has_moved)
+        self.assertFalse(self.board.get_piece_at(7, 4).has_moved)
+        self.assertEqual(self.board.get_piece_at(3, 3), pawn)
+
+    def _snapshot(self):
+        """Capture piece placement and has_moved flags of the whole board"""
+        return [(row, col, piece, piece.has_moved if piece else None)
+                for row in range(8) for col in range(8)
+                for piece in [self.board.get_piece_at(row, col)]]
+    
+    def test_push_pop_restores_castling(self):
+        """Test that popping a castling move puts king and rook back"""
+        for col in (5, 6):
+            self.board.set_piece_at(7, col, None)
+        before = self._snapshot()
+        bitboards = list(self.board.bitboards)
+        
+        self.board.push_move(encode_move(60, 62))
+        self.assertIsInstance(self.board.get_piece_at(7, 5), Rook)
+        self.assertEqual(self.board.current_player, BLACK_PIECE)
+        
+        self.board.pop_move()
+        self.assertEqual(self._snapshot(), before)
+        self.assertEqual(self.board.bitboards, bitboards)
+        self.assertEqual(self.board.current_player, WHITE_PIECE)
+    
+    def test_push_pop_restores_promotion_capture(self):
+        """Test that popping a capturing promotion restores pawn and victim"""
+        self.board.set_piece_at(1, 1, Pawn(WHITE_PIECE, (1, 1)))
+        before = self._snapshot()
+        
+        self.board.push_move(encode_move(9, 0, KNIGHT))
+        self.assertIsInstance(self.board.get_piece_at(0, 0), Knight)
+        
+        self.board.pop_move()
+        self.assertEqual(self._snapshot(), before)
+    
+    def test_undo_move(self):
+        """Test that undo_move restores the position and has_moved flags"""
+        before = self._snapshot()
+        self.board.move_piece((6, 4), (4, 4))
+        self.board.move_piece((1, 3), (3, 3))
+        self.board.move_piece((4, 4), (3, 3))
+        
+        self.assertTrue(self.board.undo_move())
+        self.assertTrue(self.board.undo_move())
+        self.assertTrue(self.board.undo_move())
+        self.assertFalse(self.board.undo_move())
+        self.assertEqual(self._snapshot(), before)
+
+    def test_hash_key_incremental(self):
+        """Test that the incremental hash matches a full recomputation"""
+        start_key = self.board.hash_key
+        self.assertEqual(start_key, self.board.compute_hash_key())
+        
+        for from_pos, to_pos in [((6, 4), (4, 4)), ((1, 3), (3, 3)), ((4, 4), (3, 4)),
+                                 ((1, 5), (3, 5)), ((7, 5), (4, 2)), ((0, 4), (1, 5))]:
+            self.board.move_piece(from_pos, to_pos)
+            self.assertEqual(self.board.hash_key, self.board.compute_hash_key())
+        
+        while self.board.undo_move():
+            self.assertEqual(self.board.hash_key, self.board.compute_hash_key())
+        self.assertEqual(self.board.hash_key, start_key)
+    
+    def test_en_passant_square_and_castling_rights(self):
+        """Test en passant square and castling rights feed the hash"""
+        self.board.move_piece((6, 4), (4, 4))
+        self.board.move_piece((1, 0), (2, 0))
+        self.board.move_piece((4, 4), (3, 4))
+        self.board.move_piece((1, 3), (3, 3))
+        self.assertEqual(self.board.en_passant_square, 2 * 8 + 3)
+        self.assertEqual(self.board.hash_key, self.board.compute_hash_key())
+        
+        self.board.move_piece((7, 4), (6, 4))
+        self.assertEqual(self.board.castling_rights, BLACK_KINGSIDE | BLACK_QUEENSIDE)
+        self.assertIsNone(self.board.en_passant_square)
+        self.assertEqual(self.board.hash_key, self.board.compute_hash_key())
+    
+    def test_transposition_positions_are_equal(self):
+        """Test that move orders reaching the same position hash alike"""
+        other = Board()
+        for from_pos, to_pos in [((7, 6), (5, 5)), ((0, 6), (2, 5)), ((7, 1), (5, 2)), ((0, 1), (2, 2))]:
+            self.board.move_piece(from_pos, to_pos)
+        for from_pos, to_pos in [((7, 1), (5, 2)), ((0, 1), (2, 2)), ((7, 6), (5, 5)), ((0, 6), (2, 5))]:
+            other.move_piece(from_pos, to_pos)
+        
+        self.assertEqual(self.board, other)
+        self.assertEqual(len({self.board, other}), 1)
+        
+        other.move_piece((5, 5), (7, 6))
+        self.assertNotEqual(self.board, other)
+    
+    def test_king_squares_tracked(self):
+        """Test that king squares follow king moves, castling, undo and direct placement"""
+        self.assertEqual(self.board.king_squares, [60, 4])
+        for col in (5, 6):
+            self.board.set_piece_at(7, col, None)
+        self.board.push_move(encode_move(60, 62))
+        self.assertEqual(self.board.king_squares, [62, 4])
+        self.board.pop_move()
+        self.assertEqual(self.board.king_squares, [60, 4])
+        
+        self.board.set_piece_at(0, 4, None)
+        self.board.set_piece_at(3, 3, King(BLACK_PIECE, (3, 3)))
+        self.assertEqual(self.board.king_squares, [60, 27])
+        self.assertEqual(Board.from_fen("8/8/8/8/8/8/8/K6k w - - 0 1").king_squares, [56, 63])
+    
+    def test_attack_maps_incremental(self):
+        """Test that incrementally updated attack maps match a full rebuild"""
+        rng = random.Random(7)
+        for _ in range(40):
+            moves = self.board.generate_legal_moves()
+            if not moves:
+                break
+            self.board.push_move(rng.choice(moves))
+            piece_attacks = self.board.piece_attacks
+            self.board._compute_attack_maps()
+            self.assertEqual(piece_attacks, self.board.piece_attacks)
+        while self.board._undo_stack:
+            self.board.pop_move()
+        self.assertEqual(self.board.attacked_squares(WHITE_PIECE), Board().attacked_squares(WHITE_PIECE))
+        self.assertTrue(self.board.is_square_attacked(40, WHITE_PIECE))
+        self.assertFalse(self.board.is_square_attacked(32, WHITE_PIECE))
+    
+    def test_legal_move_cache(self):
+        """Test that repeated positions are answered from the shared LRU move cache"""
+        cache = Board.move_cache
+        cache.clear()
+        self.board.select_piece(6, 4)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        self.board.select_piece(7, 6)
+        # Moving and undoing refresh the game status, which asks for legal moves too
+        self.board.move_piece((6, 4), (4, 4))
+        self.board.undo_move()
+        self.assertEqual(len(self.board.generate_legal_moves()), 20)
+        self.assertEqual((cache.hits, cache.misses), (3, 2))
+        
+        # Every caller gets its own copy: changing it can't corrupt the cache
+        moves = self.board.generate_legal_moves()
+        moves.remove(moves[0])
+        self.assertEqual(len(self.board.generate_legal_moves()), 20)
+        self.assertEqual(len(Board().generate_legal_moves()), 20)
+        
+        # The status refresh after a move fills the cache; lazy checks only peek
+        self.board.move_piece((6, 3), (4, 3))
+        self.assertIsNotNone(cache.peek(self.board.hash_key))
+        lookups = cache.hits + cache.misses
+        self.assertTrue(Board.from_fen("4k3/8/8/8/8/8/8/4K3 w - - 0 1").has_legal_moves())
+        self.assertEqual(cache.hits + cache.misses, lookups)
+        
+        small = MoveCache(capacity=2)
+        for key in (1, 2, 1, 3):
+            if small.get(key) is None:
+                small.put(key, ())
+        self.assertEqual(len(small), 2)
+        self.assertIsNotNone(small.get(1))
+        self.assertIsNone(small.get(2))
+    
+    def test_status_follows_moves_and_undo(self):
+        """Test the cached game status is refreshed by move_piece and undo_move"""
+        self.assertEqual(self.board.status, IN_PROGRESS)
+        for from_pos, to_pos in [((6, 5), (5, 5)), ((1, 4), (3, 4)), ((6, 6), (4, 6))]:
+            self.board.move_piece(from_pos, to_pos)
+        self.assertEqual(self.board.status, IN_PROGRESS)
+        self.board.move_piece((0, 3), (4, 7))
+        self.assertEqual(self.board.status, CHECKMATE)
+        
+        # Search-style push/pop drops the cached status, to be worked out again
+        self.board.undo_move()
+        self.board.push_move(encode_move(8, 16))
+        self.board.pop_move()
+        self.assertEqual(self.board.status, IN_PROGRESS)
+        
+        self.board.move_piece((0, 5), (4, 1))
+        self.board.move_piece((6, 3), (5, 3))
+        self.board.move_piece((4, 1), (5, 2))
+        self.assertEqual(self.board.status, CHECK)
+        
+        # Editing squares directly refreshes it too
+        board = Board()
+        self.assertEqual(board.status, IN_PROGRESS)
+        board.set_piece_at(6, 4, None)
+        board.set_piece_at(1, 4, None)
+        board.set_piece_at(3, 4, Rook(BLACK_PIECE, (3, 4)))
+        self.assertTrue(board.is_in_check(WHITE_PIECE))
+        self.assertEqual(board.status, CHECK)
+    
+    def test_threefold_repetition(self):
+        """Test repetitions are counted from the hash history, through undo too"""
+        shuffle = [((7, 6), (5, 5)), ((0, 6), (2, 5)), ((5, 5), (7, 6)), ((2, 5), (0, 6))]
+        self.board.move_piece(*shuffle[0])
+        self.assertFalse(self.board.is_repetition())
+        for from_pos, to_pos in shuffle[1:]:
+            self.board.move_piece(from_pos, to_pos)
+        self.assertTrue(self.board.is_repetition())
+        self.assertEqual(self.board.repetition_count(), 2)
+        self.assertEqual(self.board.status, IN_PROGRESS)
+        
+        for from_pos, to_pos in shuffle:
+            self.board.move_piece(from_pos, to_pos)
+        self.assertEqual(self.board.repetition_count(), 3)
+        self.assertEqual(self.board.status, THREEFOLD_REPETITION)
+        
+        self.board.undo_move()
+        self.assertEqual(self.board.repetition_count(), 2)
+        self.assertEqual(self.board.status, IN_PROGRESS)
+        
+        # A pawn move can't be undone by later moves, so history before it is not scanned
+        self.board.move_piece((2, 5), (0, 6))
+        self.board.move_piece((6, 4), (4, 4))
+        self.assertEqual(self.board.halfmove_clock, 0)
+        self.assertFalse(self.board.is_repetition())
+    
+    def test_fifty_move_rule(self):
+        """Test the fifty-move rule ends the game unless the last move mates"""
+        board = Board.from_fen("7k/8/8/8/8/8/8/R6K w - - 99 80")
+        self.assertFalse(board.is_fifty_move_draw())
+        board.move_piece((7, 7), (6, 7))
+        self.assertTrue(board.is_fifty_move_draw())
+        self.assertEqual(board.status, FIFTY_MOVE_RULE)
+        
+        board = Board.from_fen("7k/8/6K1/8/8/8/8/R7 w - - 99 80")
+        board.move_piece((7, 0), (0, 0))
+        self.assertEqual(board.status, CHECKMATE)
+    
+    def test_clone_is_independent(self):
+        """Test a clone copies the position and history but shares no mutable state"""
+        self.board.move_piece((6, 4), (4, 4))
+        self.board.select_piece(1, 4)
+        fen = self.board.to_fen()
+        clone = self.board.clone()
+        self.assertEqual(clone, self.board)
+        self.assertEqual(clone.to_fen(), self.board.to_fen())
+        self.assertIsNone(clone.selected_piece)
+        self.assertEqual(len(clone.move_history), 1)
+        
+        clone.move_piece((1, 4), (3, 4))
+        self.assertEqual(self.board.get_piece_at(1, 4), Pawn(BLACK_PIECE, (1, 4)))
+        self.assertEqual(len(self.board.move_history), 1)
+        self.assertTrue(clone.undo_move() and clone.undo_move())
+        self.assertEqual(clone.to_fen(), Board().to_fen())
+        self.assertEqual(self.board.to_fen(), fen)
+        
+        fresh = copy.deepcopy(self.board).clone(history=False)
+        self.assertEqual(fresh, self.board)
+        self.assertFalse(fresh.undo_move())
+    
+    def test_seek_through_history(self):
+        """Test any ply of a long game can be looked up and returned to from snapshots"""
+        rng = random.Random(3)
+        fens = [self.board.to_fen()]
+        while len(fens) < 120:
+            moves = self.board.generate_legal_moves()
+            if not moves or self.board.status in GAME_OVER_STATUSES:
+                break
+            move = rng.choice(moves)
+            self.board.move_piece(square_position(move_from(move)), square_position(move_to(move)))
+            fens.append(self.board.to_fen())
+        plies = len(fens) - 1
+        self.assertGreater(plies, 2 * SNAPSHOT_INTERVAL)
+        
+        for ply in (0, 1, SNAPSHOT_INTERVAL, SNAPSHOT_INTERVAL + 5, plies):
+            self.assertEqual(self.board.position_at(ply).to_fen(), fens[ply])
+        self.assertEqual(self.board.to_fen(), fens[-1])
+        
+        self.board.seek(SNAPSHOT_INTERVAL + 5)
+        self.assertEqual(self.board.to_fen(), fens[SNAPSHOT_INTERVAL + 5])
+        self.assertEqual(len(self.board.move_history), SNAPSHOT_INTERVAL + 5)
+        self.assertEqual(self.board, self.board.position().to_board())
+        self.assertTrue(self.board.undo_move())
+        self.assertEqual(self.board.to_fen(), fens[SNAPSHOT_INTERVAL + 4])
+        self.board.seek(0)
+        self.assertEqual(self.board.to_fen(), fens[0])
+        with self.assertRaises(ValueError):
+            self.board.position_at(1)
+    
+    def test_fen_round_trip(self):
+        """Test FEN loading and serialization, including clocks and en passant"""
+        self.assertEqual(self.board.to_fen(), STARTING_FEN)
+        
+        self.board.move_piece((6, 4), (4, 4))
+        self.board.move_piece((0, 6), (2, 5))
+        self.board.move_piece((4, 4), (3, 4))
+        self.board.move_piece((1, 3), (3, 3))
+        fen = self.board.to_fen()
+        self.assertEqual(fen, "rnbqkb1r/ppp1pppp/5n2/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 3")
+        
+        loaded = Board.from_fen(fen)
+        self.assertEqual(loaded.to_fen(), fen)
+        self.assertEqual(loaded, self.board)
+        self.assertEqual(loaded.hash_key, loaded.compute_hash_key())
+        self.assertEqual(loaded.bitboards, self.board.bitboards)
+        self.assertEqual(sorted(loaded.generate_legal_moves()), sorted(self.board.generate_legal_moves()))
+        
+        # EPD lines carry no clocks
+        epd = Board.from_fen("4k3/8/8/8/8/8/8/4K2R w K -")
+        self.assertEqual(epd.to_fen(), "4k3/8/8/8/8/8/8/4K2R w K - 0 1")
+        
+        for bad_fen in ["8/8/8 w - - 0 1", "rnbqkbnr/ppppxppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+                        "4k3/8/8/8/8/8/8/4K2R w X - 0 1", "4k3/8/8/8/8/8/8/4K2R w K e 0 1",
+                        "4k3/8/8/8/8/8/8/4K2R w K z6 0 1", "4k3/8/8/8/8/8/8/4K2R w K e3 0 1"]:
+            with self.assertRaises(ValueError):
+                Board.from_fen(bad_fen)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,180 @@
+import unittest
+import random
+import sys
+import os
+
+# Add src to path for testing
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from board import Board
+from pieces import Pawn, Rook, Bishop, Queen, King
+from constants import WHITE_PIECE, BLACK_PIECE, PAWN, QUEEN, KNIGHT
+from attack_tables import KNIGHT_ATTACKS, KING_ATTACKS, BETWEEN, LINE, ray_attacks, ROOK_DIRECTIONS, BISHOP_DIRECTIONS
+from magic import rook_attacks, bishop_attacks
+import movegen
+from move import encode_move, decode_move, move_from, move_to, move_promotion, move_to_uci
+
+class TestMoveGeneration(unittest.TestCase):
+    def setUp(self):
+        """Set up an empty board before each test"""
+        self.board = Board()
+        for row in range(8):
+            for col in range(8):
+                self.board.set_piece_at(row, col, None)
+        self.board.castling_rights = 0
+    
+    def place(self, piece_class, color, row, col):
+        """Put a new piece on the board"""
+        self.board.set_piece_at(row, col, piece_class(color, (row, col)))
+    
+    def moves_from(self, row, col):
+        """Legal destination squares of the piece on (row, col)"""
+        square = row * 8 + col
+        return {move_to(move) for move in self.board.generate_legal_moves() if move_from(move) == square}
+    
+    def test_attack_tables(self):
+        """Test precomputed geometry on a few known squares"""
+        self.assertEqual(bin(KNIGHT_ATTACKS[0]).count('1'), 2)
+        self.assertEqual(bin(KNIGHT_ATTACKS[27]).count('1'), 8)
+        self.assertEqual(bin(KING_ATTACKS[63]).count('1'), 3)
+        self.assertEqual(BETWEEN[0][63], sum(1 << (9 * i) for i in range(1, 7)))
+        self.assertEqual(BETWEEN[0][10], 0)
+        self.assertEqual(LINE[1][3], 0xFF)
+        self.assertEqual(ray_attacks(0, ROOK_DIRECTIONS, 1 << 16 | 1 << 2), 1 << 1 | 1 << 2 | 1 << 8 | 1 << 16)
+    
+    def test_magic_lookups_match_rays(self):
+        """Test magic slider lookups against ray stepping on random occupancies"""
+        rng = random.Random(42)
+        for _ in range(2000):
+            square = rng.randrange(64)
+            occupied = rng.getrandbits(64) & rng.getrandbits(64)
+            self.assertEqual(rook_attacks(square, occupied), ray_attacks(square, ROOK_DIRECTIONS, occupied))
+            self.assertEqual(bishop_attacks(square, occupied), ray_attacks(square, BISHOP_DIRECTIONS, occupied))
+    
+    def test_start_position_move_count(self):
+        """Test the start position has 20 legal moves"""
+        self.assertEqual(len(Board().generate_legal_moves()), 20)
+    
+    def test_pinned_piece_stays_on_line(self):
+        """Test a pinned rook can only move along the pin"""
+        self.place(King, WHITE_PIECE, 7, 4)
+        self.place(Rook, WHITE_PIECE, 5, 4)
+        self.place(Rook, BLACK_PIECE, 0, 4)
+        self.place(King, BLACK_PIECE, 0, 0)
+        
+        self.assertEqual(self.moves_from(5, 4), {6 * 8 + 4, 4 * 8 + 4, 3 * 8 + 4, 2 * 8 + 4, 1 * 8 + 4, 4})
+    
+    def test_check_evasions(self):
+        """Test that in check only captures, blocks and king moves are legal"""
+        self.place(King, WHITE_PIECE, 7, 4)
+        self.place(Rook, WHITE_PIECE, 7, 0)
+        self.place(Bishop, WHITE_PIECE, 5, 1)
+        self.place(Queen, BLACK_PIECE, 4, 7)
+        self.place(King, BLACK_PIECE, 0, 0)
+        
+        self.assertTrue(self.board.is_in_check(WHITE_PIECE))
+        # Neither the bishop nor the rook can capture the queen or block on f2/g3
+        self.assertEqual(self.moves_from(5, 1), set())
+        self.assertEqual(self.moves_from(7, 0), set())
+        self.assertEqual(self.moves_from(7, 4), {7 * 8 + 3, 7 * 8 + 5, 6 * 8 + 3, 6 * 8 + 4})
+    
+    def test_en_passant(self):
+        """Test en passant is generated and removes the captured pawn"""
+        self.place(King, WHITE_PIECE, 7, 4)
+        self.place(King, BLACK_PIECE, 0, 4)
+        self.place(Pawn, WHITE_PIECE, 3, 4)
+        self.place(Pawn, BLACK_PIECE, 1, 3)
+        self.board.current_player = BLACK_PIECE
+        
+        self.board.move_piece((1, 3), (3, 3))
+        self.assertIn(2 * 8 + 3, self.moves_from(3, 4))
+        
+        self.board.move_piece((3, 4), (2, 3))
+        self.assertIsNone(self.board.get_piece_at(3, 3))
+        self.board.undo_move()
+        self.assertIsInstance(self.board.get_piece_at(3, 3), Pawn)
+        
+        # Only the side to move may capture en passant
+        board = Board.from_fen("4k3/8/8/8/3p4/8/3PP3/4K3 w - - 0 1")
+        board.move_piece((6, 4), (4, 4))
+        self.assertIn(encode_move(35, 44), board.generate_legal_moves())
+        self.assertNotIn(encode_move(51, 44), board.generate_legal_moves(WHITE_PIECE))
+        self.assertNotIn((5, 4), board.get_piece_at(6, 3).get_valid_moves(board))
+    
+    def test_en_passant_discovered_check(self):
+        """Test en passant is illegal when it exposes the king along the rank"""
+        self.place(King, WHITE_PIECE, 3, 0)
+        self.place(Rook, BLACK_PIECE, 3, 7)
+        self.place(King, BLACK_PIECE, 0, 4)
+        self.place(Pawn, WHITE_PIECE, 3, 4)
+        self.place(Pawn, BLACK_PIECE, 1, 3)
+        self.board.current_player = BLACK_PIECE
+        
+        self.board.move_piece((1, 3), (3, 3))
+        self.assertNotIn(2 * 8 + 3, self.moves_from(3, 4))
+    
+    def test_promotions(self):
+        """Test a pawn on the seventh rank has four promotion choices"""
+        self.place(King, WHITE_PIECE, 7, 4)
+        self.place(King, BLACK_PIECE, 0, 7)
+        self.place(Pawn, WHITE_PIECE, 1, 0)
+        
+        promotions = {move_promotion(move) for move in self.board.generate_legal_moves() if move_from(move) == 8}
+        self.assertEqual(len(promotions), 4)
+        self.assertIn(QUEEN, promotions)
+        self.assertIn(KNIGHT, promotions)
+    
+    def test_checkmate_and_stalemate(self):
+        """Test terminal positions are detected from legal moves"""
+        board = Board()
+        for from_pos, to_pos in [((6, 5), (5, 5)), ((1, 4), (3, 4)), ((6, 6), (4, 6)), ((0, 3), (4, 7))]:
+            board.move_piece(from_pos, to_pos)
+        self.assertTrue(board.is_checkmate(WHITE_PIECE))
+        
+        self.place(King, BLACK_PIECE, 0, 0)
+        self.place(Queen, WHITE_PIECE, 2, 1)
+        self.place(King, WHITE_PIECE, 7, 7)
+        self.board.current_player = BLACK_PIECE
+        self.assertTrue(self.board.is_stalemate(BLACK_PIECE))
+        self.assertFalse(self.board.is_checkmate(BLACK_PIECE))
+    
+    def test_lazy_generation(self):
+        """Test the move generator stages captures first and can stop early"""
+        board = Board.from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+        staged = list(movegen.iter_legal_moves(board, captures_first=True))
+        self.assertEqual(sorted(staged), sorted(movegen.generate_legal_moves(board)))
+        
+        enemies = board.get_occupancy(BLACK_PIECE)
+        is_capture = [enemies >> move_to(move) & 1 == 1 for move in staged]
+        self.assertEqual(is_capture.count(True), 8)
+        self.assertEqual(is_capture, sorted(is_capture, reverse=True))
+        
+        moves = movegen.iter_legal_moves(board)
+        self.assertIsInstance(next(moves), int)
+        moves.close()
+        self.assertTrue(board.has_legal_moves())
+    
+    def test_packed_moves(self):
+        """Test moves pack into 16 bits, come in array('H') lists and rebuild for the UI"""
+        move = encode_move(12, 4, QUEEN)
+        self.assertLess(move, 1 << 16)
+        self.assertEqual(decode_move(move), (12, 4, QUEEN))
+        self.assertEqual(move_to_uci(move), 'e7e8q')
+        self.assertEqual(decode_move(encode_move(52, 36)), (52, 36, None))
+        
+        board = Board()
+        moves = board.generate_legal_moves()
+        self.assertEqual((moves.typecode, moves.itemsize), ('H', 2))
+        self.assertIn(encode_move(52, 36), moves)
+        
+        board.move_piece((6, 4), (4, 4))
+        played = board.move_history[-1]
+        self.assertFalse(hasattr(played, '__dict__'))
+        self.assertEqual(played.move, encode_move(52, 36))
+        self.assertEqual((played.from_pos, played.to_pos), ((6, 4), (4, 4)))
+        self.assertEqual((played.color, played.piece_type), (WHITE_PIECE, PAWN))
+        self.assertIsInstance(played.piece, Pawn)
+        self.assertIsNone(played.captured_piece)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+
+# Add src to path for testing
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from board import Board
+from perft import perft, divide, PerftTable
+from constants import STARTING_FEN
+
+KIWIPETE_FEN = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+# Published perft results: (FEN, node counts for depth 1, 2, 3)
+PERFT_POSITIONS = [
+    (STARTING_FEN, [20, 400, 8902]),
+    (KIWIPETE_FEN, [48, 2039]),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812]),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", [6, 264, 9467]),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486]),
+    ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", [46, 2079]),
+]
+
+class TestPerft(unittest.TestCase):
+    def test_published_counts(self):
+        """Test move generation against published perft node counts"""
+        for fen, counts in PERFT_POSITIONS:
+            board = Board.from_fen(fen)
+            for depth, expected in enumerate(counts, start=1):
+                self.assertEqual(perft(board, depth), expected, f"{fen} depth {depth}")
+    
+    def test_perft_leaves_board_unchanged(self):
+        """Test that perft makes and unmakes every move exactly"""
+        board = Board.from_fen(KIWIPETE_FEN)
+        key = board.hash_key
+        perft(board, 3)
+        self.assertEqual(board.hash_key, key)
+        self.assertEqual(board.compute_hash_key(), key)
+    
+    def test_hash_table_gives_same_count(self):
+        """Test that the perft hash table does not change results"""
+        table = PerftTable(1)
+        self.assertEqual(perft(Board(), 4, table), 197281)
+        
+        # Transpositions show up from five plies on
+        board = Board.from_fen("8/8/8/4k3/8/8/8/R3K3 w Q - 0 1")
+        self.assertEqual(perft(board, 5, table), perft(board, 5))
+        self.assertGreater(table.hits, 0)
+    
+    def test_divide_sums_to_total(self):
+        """Test divide splits the total over the root moves"""
+        results = divide(KIWIPETE_FEN, 2)
+        self.assertEqual(len(results), 48)
+        self.assertEqual(sum(count for move, count in results), 2039)
+        
+        split = divide(STARTING_FEN, 3, hash_mb=1, processes=2)
+        self.assertEqual(sum(count for move, count in split), 8902)
+        
+        # Depth 0 is the root alone, with no root moves to divide
+        self.assertEqual(divide(STARTING_FEN, 0), [])
+        self.assertEqual(perft(Board(), 0), 1)
+        with self.assertRaises(ValueError):
+            divide(STARTING_FEN, -1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,7 +7,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from pieces import Pawn, Rook, Knight, Bishop, Queen, King
 from board import Board
-from constants import WHITE_PIECE, BLACK_PIECE
+from constants import WHITE_PIECE, BLACK_PIECE, KNIGHT, Color, PieceType
 
 class TestPieces(unittest.TestCase):
     def setUp(self):
@@ -73,6 +73,20 @@ class TestPieces(unittest.TestCase):
         # King should be able to move to adjacent squares
         self.assertIn((6, 4), moves)
         self.assertTrue(len(moves) > 0)
+    
+    def test_compact_pieces(self):
+        """Test pieces use slots and integer colors and types"""
+        knight = self.board.get_piece_at(7, 1)
+        self.assertFalse(hasattr(knight, '__dict__'))
+        self.assertIs(knight.color, Color.WHITE)
+        self.assertIs(knight.get_piece_type(), PieceType.KNIGHT)
+        self.assertEqual(knight.get_piece_type(), KNIGHT)
+        self.assertTrue(knight.is_white())
+        
+        # The old string names are still available through str()
+        self.assertEqual(str(WHITE_PIECE), 'white')
+        self.assertEqual(str(BLACK_PIECE), 'black')
+        self.assertEqual(str(KNIGHT), 'knight')
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
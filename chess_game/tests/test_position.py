@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+
+# Add src to path for testing
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from board import Board
+from position import Position
+from move import encode_move, move_from
+from ai_player import AIPlayer
+
+class TestPosition(unittest.TestCase):
+    def setUp(self):
+        """Set up a board a few moves into the game before each test"""
+        self.board = Board()
+        for from_pos, to_pos in [((6, 4), (4, 4)), ((1, 4), (3, 4)), ((7, 6), (5, 5))]:
+            self.board.move_piece(from_pos, to_pos)
+    
+    def test_snapshot_round_trip(self):
+        """Test a snapshot rebuilds an equal board and is unaffected by later moves"""
+        position = self.board.position()
+        self.assertIsInstance(position, Position)
+        self.assertEqual(hash(position), hash(self.board))
+        self.assertEqual(position.to_fen(), self.board.to_fen())
+        
+        rebuilt = position.to_board()
+        self.assertEqual(rebuilt, self.board)
+        self.assertEqual(rebuilt.piece_attacks, self.board.piece_attacks)
+        self.assertEqual(rebuilt.king_squares, self.board.king_squares)
+        self.assertEqual(set(position.legal_moves()), set(self.board.generate_legal_moves()))
+        
+        fen = position.to_fen()
+        self.board.move_piece((1, 1), (2, 1))
+        self.assertEqual(position.to_fen(), fen)
+        self.assertNotEqual(position, self.board.position())
+        with self.assertRaises(AttributeError):
+            position.hash_key = 0
+    
+    def test_push_and_repetition_history(self):
+        """Test positions follow moves and keep the keys needed for repetitions"""
+        position = self.board.position()
+        after = position.push(encode_move(0 * 8 + 6, 2 * 8 + 5))
+        self.assertEqual(after.current_player, self.board.current_player ^ 1)
+        self.assertEqual(len({position, after, self.board.position()}), 2)
+        
+        # Knights out and back twice: the snapshot still sees the repetition
+        for from_pos, to_pos in [((0, 6), (2, 5)), ((5, 5), (7, 6)), ((2, 5), (0, 6)), ((7, 6), (5, 5))] * 2:
+            self.board.move_piece(from_pos, to_pos)
+        self.assertEqual(self.board.position().to_board().repetition_count(), 3)
+    
+    def test_ai_searches_snapshot(self):
+        """Test the AI accepts a snapshot and returns a legal move for it"""
+        position = self.board.position()
+        from_pos, to_pos, promotion = AIPlayer('medium').get_move(position)
+        self.assertIn(from_pos[0] * 8 + from_pos[1], {move_from(move) for move in position.legal_moves()})
+        self.assertEqual(position.to_fen(), self.board.to_fen())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import unittest
+import threading
+import time
+import sys
+import os
+
+# Add src to path for testing
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from board import Board
+from search import Search, evaluate, MATE_SCORE, MATE_BOUND
+from move import encode_move, move_to_uci
+from ai_player import AIPlayer
+from pieces import Knight
+from constants import KNIGHT, CHECKMATE, WHITE_PIECE, BLACK_PIECE
+
+def minimax(board, depth, counter):
+    """Plain negamax without pruning, for checking alpha-beta scores"""
+    counter[0] += 1
+    if board.is_repetition() or board.is_fifty_move_draw():
+        return 0
+    moves = board.generate_legal_moves()
+    if not moves:
+        return -MATE_SCORE if board.is_in_check(board.current_player) else 0
+    if depth == 0:
+        return evaluate(board)
+    best = -MATE_SCORE - 1
+    for move in moves:
+        board.push_move(move)
+        best = max(best, -minimax(board, depth - 1, counter))
+        board.pop_move()
+    return best
+
+class TestSearch(unittest.TestCase):
+    def test_finds_mate_in_one(self):
+        """Test the search plays a mate in one and scores it as a mate"""
+        board = Board.from_fen("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+        move, score = Search().search(board, 3)
+        self.assertEqual(move_to_uci(move), 'a1a8')
+        self.assertGreater(score, MATE_BOUND)
+    
+    def test_alpha_beta_matches_minimax(self):
+        """Test pruning keeps the minimax score while visiting fewer nodes"""
+        fens = ["r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+                "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"]
+        for fen in fens:
+            board = Board.from_fen(fen)
+            search = Search()
+            best_move, score = search.search(board, 3)
+            self.assertEqual(board.to_fen(), fen)
+            
+            counter = [-1]  # The root isn't counted by Search
+            self.assertEqual(score, minimax(board, 3, counter))
+            self.assertLess(search.nodes, counter[0] / 2)
+    
+    def test_evaluate_is_symmetric(self):
+        """Test the static score is from the side to move's point of view"""
+        board = Board.from_fen("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1")
+        self.assertLess(evaluate(board), 0)
+        board.push_move(encode_move(12, 28))
+        self.assertEqual(evaluate(board), 0)
+    
+    def test_legacy_evaluation_for_either_color(self):
+        """Test the legacy scorer evaluates for White (index 0) when Black is to move"""
+        board = Board.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBN1 b Qkq - 0 1")
+        ai = AIPlayer()
+        self.assertEqual(ai._evaluate_material(board, WHITE_PIECE), -5)
+        self.assertEqual(ai._evaluate_material(board, BLACK_PIECE), 5)
+        self.assertEqual(ai._evaluate_material(board), 5)
+        board.move_piece((1, 4), (3, 4))
+        self.assertNotEqual(ai._evaluate_position(board, WHITE_PIECE), ai._evaluate_position(board, BLACK_PIECE))
+    
+    def test_iterative_deepening_budgets(self):
+        """Test iterative deepening stops within its budget with the board restored"""
+        fen = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+        board = Board.from_fen(fen)
+        search = Search()
+        
+        move, score = search.iterate(board, node_limit=3000)
+        self.assertIn(move, board.generate_legal_moves())
+        self.assertLessEqual(search.nodes, 3000)
+        self.assertGreaterEqual(search.depth, 2)
+        self.assertEqual(board.to_fen(), fen)
+        
+        # The clock is checked often enough to stop within 50 ms of the budget
+        start = time.perf_counter()
+        move, score = search.iterate(board, time_limit=0.3)
+        self.assertLess(time.perf_counter() - start, 0.3 + 0.05)
+        self.assertIn(move, board.generate_legal_moves())
+        self.assertEqual(board.to_fen(), fen)
+        
+        # Iterations are searched to full depth, so they match fixed-depth searches
+        search.iterate(board, max_depth=2)
+        self.assertEqual(search.depth, 2)
+        self.assertEqual(search.iterate(board, max_depth=2)[1], Search().search(board, 2)[1])
+    
+    def test_move_ordering(self):
+        """Test the table move leads, then captures by MVV-LVA, killers and history"""
+        # White: Qd1 and Pc4 can take the rook on d5 or the pawn on b5
+        board = Board.from_fen("4k3/8/8/1p1r4/2P5/8/8/3QK3 w - - 0 1")
+        search = Search()
+        pawn_takes_rook = encode_move(34, 27)
+        queen_takes_rook = encode_move(59, 27)
+        pawn_takes_pawn = encode_move(34, 25)
+        quiet = encode_move(60, 52)
+        killer = encode_move(59, 51)
+        search.killers[3][0] = killer
+        search.history[quiet & 0xFFF] = 100
+        
+        moves = search.order_moves(board, board.iter_legal_moves(), table_move=encode_move(60, 61), ply=3)
+        self.assertEqual(moves[:6], [encode_move(60, 61), pawn_takes_rook, queen_takes_rook,
+                                     pawn_takes_pawn, killer, quiet])
+        self.assertEqual(sorted(moves), sorted(board.generate_legal_moves()))
+        
+        # A table move that isn't legal here is ignored
+        moves = search.order_moves(board, board.iter_legal_moves(), table_move=encode_move(0, 1))
+        self.assertEqual(moves[0], pawn_takes_rook)
+    
+    def test_cutoff_statistics(self):
+        """Test quiet cutoffs feed the killers and history, and the first-move rate is reported"""
+        board = Board.from_fen("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+        search = Search()
+        search.search(board, 3)
+        self.assertGreater(search.cutoffs, 0)
+        self.assertLessEqual(search.first_move_cutoffs, search.cutoffs)
+        self.assertGreater(search.first_move_cutoff_rate, 0.5)
+        self.assertTrue(any(search.history))
+        self.assertTrue(any(killers[0] for killers in search.killers))
+        
+        # Each search starts with fresh statistics
+        search.search(board, 1)
+        self.assertEqual(search.cutoffs, 0)
+        self.assertEqual(search.first_move_cutoff_rate, 0.0)
+    
+    def test_search_fills_move_cache(self):
+        """Test interior nodes store their moves, so the next iteration finds them"""
+        cache = Board.move_cache
+        cache.clear()
+        board = Board.from_fen("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+        Search().iterate(board, max_depth=3)
+        self.assertGreater(len(cache), 0)
+        self.assertEqual(cache.misses, len(cache))  # Every miss was stored
+        self.assertGreater(cache.hits, 0)
+    
+    def test_stop_from_another_thread(self):
+        """Test stop() ends an unbounded search with a move ready"""
+        board = Board()
+        ai = AIPlayer('hard', time_limit=60)
+        timer = threading.Timer(0.3, ai.stop)
+        timer.start()
+        start = time.perf_counter()
+        self.assertIsNotNone(ai.get_move(board))
+        self.assertLess(time.perf_counter() - start, 10)
+        timer.join()
+        
+        # A stop between creating the search and starting it isn't lost
+        search = ai.new_search()
+        ai.stop()
+        start = time.perf_counter()
+        self.assertIsNotNone(ai.get_move(board, search))
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertFalse(search.stopped)  # Cleared once the search returns
+    
+    def test_ai_player_uses_search(self):
+        """Test the medium and hard players take free material"""
+        board = Board.from_fen("4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1")
+        for difficulty in ('medium', 'hard'):
+            self.assertEqual(AIPlayer(difficulty).get_move(board), ((6, 3), (3, 3), None))
+    
+    def test_ai_player_underpromotes(self):
+        """Test an underpromotion chosen by the search is played as chosen"""
+        board = Board.from_fen("7n/5Ppk/7p/8/8/8/B7/1K6 w - - 0 1")
+        from_pos, to_pos, promotion = AIPlayer('medium').get_move(board)
+        self.assertEqual((from_pos, to_pos, promotion), ((1, 5), (0, 5), KNIGHT))
+        board.select_piece(*from_pos)
+        self.assertTrue(board.make_move(*to_pos, promotion))
+        self.assertIsInstance(board.get_piece_at(0, 5), Knight)
+        self.assertEqual(board.status, CHECKMATE)
+
+if __name__ == '__main__':
+    unittest.main()
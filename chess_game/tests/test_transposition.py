@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+
+# Add src to path for testing
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from board import Board
+from search import Search, MATE_SCORE
+from move import encode_move
+from transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+class TestTranspositionTable(unittest.TestCase):
+    def setUp(self):
+        """Set up a table with a single two-slot bucket before each test"""
+        self.table = TranspositionTable(size_mb=0)
+        self.assertEqual(self.table.buckets, 1)
+    
+    def test_store_and_probe(self):
+        """Test entries pack and unpack depth, bound, score and move exactly"""
+        move = encode_move(52, 36)
+        self.table.store(12345, 7, LOWER_BOUND, -MATE_SCORE + 3, move)
+        self.assertEqual(self.table.probe(12345), (7, LOWER_BOUND, -MATE_SCORE + 3, move))
+        self.assertIsNone(self.table.probe(54321))
+        self.assertEqual((self.table.probes, self.table.hits), (2, 1))
+        self.assertEqual(self.table.hit_rate, 0.5)
+        self.assertEqual(self.table.fill_ratio, 0.5)
+        
+        # A half-written entry no longer matches its key
+        self.table.entries[0] ^= 1 << 40
+        self.assertIsNone(self.table.probe(12345))
+    
+    def test_two_tier_replacement(self):
+        """Test the deep entry keeps its slot within a search and gives it up in the next"""
+        self.table.store(1, 6, EXACT, 10)
+        self.table.store(2, 3, UPPER_BOUND, 20)
+        self.table.store(3, 2, UPPER_BOUND, 30)
+        self.assertEqual(self.table.probe(1)[0], 6)
+        self.assertIsNone(self.table.probe(2))  # Always-replace slot was overwritten
+        self.assertEqual(self.table.probe(3)[2], 30)
+        self.assertEqual(len(self.table), 2)
+        
+        self.table.new_search()
+        self.table.store(4, 1, EXACT, 40)
+        self.assertIsNone(self.table.probe(1))
+        self.assertEqual(self.table.probe(4)[0], 1)
+    
+    def test_search_with_table(self):
+        """Test a table saves nodes without changing the search result"""
+        fen = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+        plain = Search()
+        plain_score = plain.iterate(Board.from_fen(fen), max_depth=4)[1]
+        table = TranspositionTable(size_mb=1)
+        cached = Search(table)
+        self.assertEqual(cached.iterate(Board.from_fen(fen), max_depth=4)[1], plain_score)
+        self.assertLess(cached.nodes, plain.nodes)
+        self.assertGreater(table.hit_rate, 0)
+        self.assertGreater(table.fill_ratio, 0)
+
+if __name__ == '__main__':
+    unittest.main()